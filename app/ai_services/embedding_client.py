@@ -0,0 +1,89 @@
+import json
+import socket
+import struct
+import threading
+from typing import List, Union
+
+import numpy as np
+
+from app.core.compute import current_work_class, INGEST
+
+# ==========================================
+# 📡 Embedding IPC Protocol (Unix socket)
+# ==========================================
+# Request:  !IB header (length, priority) + UTF-8 JSON {"texts": [...], "batch_size": n}
+#           priority 0 = query, 1 = ingest; the server always encodes pending query texts first.
+# Response: !iII header (rows, dim, nbytes) + raw float32 row-major vectors.
+#           rows == -1 means error; the body is then a UTF-8 error message.
+REQUEST_HEADER = struct.Struct("!IB")
+PRIORITY_QUERY = 0
+PRIORITY_INGEST = 1
+RESPONSE_HEADER = struct.Struct("!iII")
+
+
+def recv_exact(sock: socket.socket, size: int) -> bytearray:
+    """
+    Reads exactly `size` bytes straight into a preallocated buffer (no intermediate copies).
+    """
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:], size - received)
+        if n == 0:
+            raise ConnectionError("Embedding server closed the connection")
+        received += n
+    return buffer
+
+
+class RemoteBGEEmbedding:
+    """
+    Drop-in replacement for BGEEmbedding that sends encode requests to the shared
+    embedding server (python -m app.ai_services.embedding_server) instead of loading
+    the model in this process. One persistent connection per thread.
+    """
+
+    def __init__(self, socket_path: str, timeout: float = 120.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._local.sock = sock
+        return sock
+
+    def _reset(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            sock.close()
+        self._local.sock = None
+
+    def get_embeddings(self, texts: Union[str, List[str]], batch_size: int = 8) -> np.ndarray:
+        if isinstance(texts, str):
+            texts = [texts]
+
+        request = json.dumps({"texts": texts, "batch_size": batch_size}, ensure_ascii=False).encode("utf-8")
+        # Calls made from the scheduler's ingest executor are background work for the server too
+        priority = PRIORITY_INGEST if current_work_class() == INGEST else PRIORITY_QUERY
+        # Retry once on a stale connection (e.g. the embedding server restarted)
+        for attempt in range(2):
+            try:
+                sock = self._connection()
+                sock.sendall(REQUEST_HEADER.pack(len(request), priority) + request)
+                rows, dim, nbytes = RESPONSE_HEADER.unpack(recv_exact(sock, RESPONSE_HEADER.size))
+                body = recv_exact(sock, nbytes)
+                break
+            except (ConnectionError, socket.timeout, OSError):
+                self._reset()
+                if attempt == 1:
+                    raise
+
+        if rows < 0:
+            raise RuntimeError(f"Embedding server error: {body.decode('utf-8', errors='replace')}")
+        # The array views the receive buffer directly
+        return np.frombuffer(body, dtype=np.float32).reshape(rows, dim)
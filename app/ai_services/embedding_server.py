@@ -0,0 +1,167 @@
+"""
+Shared embedding worker: one process owns the embedding model and its thread pool,
+API workers (EMBEDDING_MODE=remote) send encode requests over a Unix socket.
+
+Usage:
+    python -m app.ai_services.embedding_server [--socket /tmp/rag-embedding.sock] [--threads 8]
+    EMBEDDING_MODE=remote uvicorn app.main:app --workers 4
+"""
+import argparse
+import json
+import os
+import socketserver
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import List
+
+import numpy as np
+
+from app.core.config import settings
+from app.ai_services.embedding_client import REQUEST_HEADER, RESPONSE_HEADER, PRIORITY_QUERY, PRIORITY_INGEST, recv_exact
+
+# Max texts encoded together when coalescing concurrent requests into one model call.
+# Larger requests are split into parts of this size, so queued query texts can go between them.
+MAX_BATCH_TEXTS = 64
+
+
+class EmbeddingBatcher:
+    """
+    Single encode thread: drains concurrently queued requests and encodes them
+    in one model call, then hands each caller its slice of the result.
+    Query and ingest requests wait in separate queues; a batch is taken from the
+    query queue whenever it is non-empty, so queries never wait behind queued ingest parts.
+    """
+
+    def __init__(self, embedder):
+        self.embedder = embedder
+        self._queues = {PRIORITY_QUERY: deque(), PRIORITY_INGEST: deque()}
+        self._ready = threading.Condition()
+        threading.Thread(target=self._run, name="embedding-batcher", daemon=True).start()
+
+    def submit(self, texts: List[str], batch_size: int, priority: int = PRIORITY_QUERY) -> List[Future]:
+        if priority not in self._queues:
+            raise ValueError(f"Unknown priority {priority}")
+        futures = []
+        with self._ready:
+            for start in range(0, max(len(texts), 1), MAX_BATCH_TEXTS):
+                future = Future()
+                self._queues[priority].append((texts[start:start + MAX_BATCH_TEXTS], batch_size, future))
+                futures.append(future)
+            self._ready.notify()
+        return futures
+
+    def encode(self, texts: List[str], batch_size: int, priority: int = PRIORITY_QUERY) -> np.ndarray:
+        parts = [future.result() for future in self.submit(texts, batch_size, priority)]
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def _next_batch(self):
+        with self._ready:
+            while not any(self._queues.values()):
+                self._ready.wait()
+            pending = self._queues[PRIORITY_QUERY] or self._queues[PRIORITY_INGEST]
+            batch = [pending.popleft()]
+            total = len(batch[0][0])
+            while pending and total + len(pending[0][0]) <= MAX_BATCH_TEXTS:
+                batch.append(pending.popleft())
+                total += len(batch[-1][0])
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            texts = [text for request_texts, _, _ in batch for text in request_texts]
+            batch_size = max(request_batch_size for _, request_batch_size, _ in batch)
+            try:
+                vectors = np.ascontiguousarray(self.embedder.get_embeddings(texts, batch_size=batch_size), dtype=np.float32)
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            start = 0
+            for request_texts, _, future in batch:
+                future.set_result(vectors[start:start + len(request_texts)])
+                start += len(request_texts)
+
+
+class EmbeddingRequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        # Persistent connection: serve requests until the client disconnects
+        while True:
+            try:
+                length, priority = REQUEST_HEADER.unpack(recv_exact(self.request, REQUEST_HEADER.size))
+                body = recv_exact(self.request, length)
+            except (ConnectionError, OSError):
+                return
+
+            try:
+                # Malformed requests get an error frame; the connection stays usable
+                request = json.loads(body)
+                texts = request["texts"]
+                if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                    raise ValueError("'texts' must be a list of strings")
+                vectors = self.server.batcher.encode(texts, int(request.get("batch_size", 8)), priority)
+                body = memoryview(vectors).cast("B")
+                header = RESPONSE_HEADER.pack(vectors.shape[0], vectors.shape[1], body.nbytes)
+            except Exception as e:
+                body = f"{e.__class__.__name__}: {e}".encode("utf-8")
+                header = RESPONSE_HEADER.pack(-1, 0, len(body))
+
+            try:
+                self.request.sendall(header)
+                self.request.sendall(body)
+            except OSError:
+                return
+
+
+class EmbeddingServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, embedder):
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        self.batcher = EmbeddingBatcher(embedder)
+        super().__init__(socket_path, EmbeddingRequestHandler)
+
+
+def configure_threads(threads: int):
+    """
+    Must run before torch is imported: the embedding worker is the only process doing encode work.
+    """
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["MKL_NUM_THREADS"] = str(threads)
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+
+    import torch
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared embedding worker")
+    parser.add_argument("--socket", default=settings.EMBEDDING_SOCKET)
+    parser.add_argument("--threads", type=int, default=settings.EMBEDDING_SERVER_THREADS or settings.COMPUTE_CORES)
+    parser.add_argument("--model", default=settings.MODEL_NAME)
+    args = parser.parse_args()
+
+    configure_threads(args.threads)
+
+    from sentence_transformers import SentenceTransformer
+    from app.ai_services.embeding_service import BGEEmbedding
+
+    print(f"🧠 Loading AI Model: {args.model} ({args.threads} threads) ...")
+    embedder = BGEEmbedding(model=SentenceTransformer(args.model))
+
+    server = EmbeddingServer(args.socket, embedder)
+    print(f"✅ Embedding server listening on {args.socket}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(args.socket):
+            os.remove(args.socket)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+import asyncio
+import hashlib
+import json
+import random
+import time
+from typing import List, Dict, Optional
+
+import openai
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+import httpx
+
+
+class LLMGatewayError(Exception):
+    """Upstream LLM call failed (non-retryable error, retries exhausted or deadline exceeded)."""
+
+
+class CircuitOpenError(LLMGatewayError):
+    """Upstream is considered down; calls are rejected until the breaker's reset timeout elapses."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"LLM circuit breaker is open, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+    closed -> open after `failure_threshold` failures; open -> half-open after `reset_timeout`
+    seconds, where a single probe call decides whether to close again or re-open.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_call(self) -> bool:
+        """
+        Raises CircuitOpenError if the call is not allowed. Returns True if this call is the half-open probe.
+        """
+        state = self.state
+        if state == "open" or (state == "half-open" and self.probe_in_flight):
+            raise CircuitOpenError(retry_after=max(self.reset_timeout - (time.monotonic() - self.opened_at), 0))
+        if state == "half-open":
+            self.probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.probe_in_flight = False
+
+    def record_failure(self, is_probe: bool = False):
+        self.failures += 1
+        if is_probe or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        if is_probe:
+            self.probe_in_flight = False
+
+    def release_probe(self):
+        # The probe ended without a verdict on upstream (cancelled, non-retryable request error)
+        self.probe_in_flight = False
+
+
+def _is_upstream_failure(error: Exception) -> bool:
+    # Counts against the circuit breaker: upstream unreachable or broken
+    if isinstance(error, openai.APIConnectionError):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+
+def _is_retryable(error: Exception) -> bool:
+    # 429s are retried with backoff but never open the breaker: the provider is up, just throttling
+    return isinstance(error, openai.RateLimitError) or _is_upstream_failure(error)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers["retry-after"])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return None
+
+
+class LLMGateway:
+    """
+    Async chat-completion client shared by the whole process:
+    - pooled HTTP connections and a global concurrency limit,
+    - a deadline per call (covering all retries),
+    - retries with full-jitter exponential backoff on 429 / 5xx / connection errors,
+    - a circuit breaker that fails fast while upstream is down (connection errors / 5xx; 429s do not count),
+    - single-flight coalescing: identical requests already in flight share one upstream call.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str],
+        base_url: str,
+        model: str,
+        max_concurrency: int = 8,
+        timeout: float = 30.0,
+        deadline: float = 60.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        breaker_threshold: int = 5,
+        breaker_reset: float = 30.0,
+    ):
+        self.model = model
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            timeout=timeout,
+            max_retries=0,  # Retries are handled here so they share the deadline and the breaker
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+            ),
+        )
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_reset)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.upstream_calls = 0
+        self.coalesced_calls = 0
+
+    async def complete(self, messages: List[Dict[str, str]], max_tokens: int = 1024, temperature: float = 0.4) -> str:
+        """
+        Returns the assistant message content. Raises LLMGatewayError / CircuitOpenError on failure.
+        """
+        key = hashlib.sha256(
+            json.dumps([self.model, messages, max_tokens, temperature], ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced_calls += 1
+        else:
+            task = asyncio.ensure_future(self._complete_before_deadline(messages, max_tokens, temperature))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        # Shield: one caller disconnecting must not cancel the upstream call others are waiting on
+        return await asyncio.shield(task)
+
+    async def _complete_before_deadline(self, messages, max_tokens, temperature) -> str:
+        try:
+            deadline_at = time.monotonic() + self.deadline
+            return await asyncio.wait_for(self._complete_with_retries(messages, max_tokens, temperature, deadline_at), self.deadline)
+        except asyncio.TimeoutError:
+            raise LLMGatewayError(f"LLM call exceeded its {self.deadline:.0f}s deadline")
+
+    async def _complete_with_retries(self, messages, max_tokens, temperature, deadline_at: float) -> str:
+        for attempt in range(self.max_retries + 1):
+            # Only the attempt that took the half-open probe slot may release it; calls that were
+            # already in flight when the breaker opened must not let a second probe through
+            is_probe = False
+            try:
+                async with self._semaphore:
+                    # Checked after queueing so callers that waited out an outage fail fast
+                    is_probe = self.breaker.before_call()
+                    self.upstream_calls += 1
+                    response = await self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        temperature=temperature
+                    )
+                self.breaker.record_success()
+                return response.choices[0].message.content
+
+            except CircuitOpenError:
+                raise
+            except asyncio.CancelledError:
+                # Deadline hit mid-call: free the probe slot without judging upstream
+                if is_probe:
+                    self.breaker.release_probe()
+                raise
+            except Exception as e:
+                if _is_upstream_failure(e):
+                    self.breaker.record_failure(is_probe)
+                elif is_probe:
+                    self.breaker.release_probe()
+
+                if not _is_retryable(e):
+                    raise LLMGatewayError(f"LLM request failed: {e}") from e
+                if attempt == self.max_retries:
+                    raise LLMGatewayError(f"LLM request failed after {attempt + 1} attempts: {e}") from e
+
+                delay = _retry_after(e)
+                if delay is None:
+                    delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                remaining = deadline_at - time.monotonic()
+                if delay >= remaining:
+                    # Waiting out a Retry-After longer than the deadline only delays the same failure
+                    raise LLMGatewayError(f"LLM request failed ({e.__class__.__name__}), retry would exceed the deadline") from e
+                print(f"⚠️ LLM attempt {attempt + 1} failed ({e.__class__.__name__}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    async def aclose(self):
+        await self.client.close()
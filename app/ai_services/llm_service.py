@@ -1,30 +1,33 @@
-import os
-from openai import OpenAI
-from dotenv import load_dotenv
 from typing import List, Optional, Dict, Any
-from app.utils.helpers import format_search_results
-
-load_dotenv()
+from app.core.config import settings
+from app.utils.context_builder import build_context
+from app.ai_services.llm_gateway import LLMGateway
 
 class TyphoonRAGService:
-    def __init__(self):
-        self.api_key = os.getenv("OPENAI_API_KEY")
-        self.base_url = "https://api.opentyphoon.ai/v1"
-        self.model = "typhoon-v2.5-30b-a3b-instruct"
-        self.client = OpenAI(
-            api_key=self.api_key,
-            base_url=self.base_url
+    def __init__(self, gateway: Optional[LLMGateway] = None):
+        self.model = settings.LLM_MODEL
+        self.gateway = gateway or LLMGateway(
+            api_key=settings.LLM_API_KEY,
+            base_url=settings.LLM_BASE_URL,
+            model=self.model,
+            max_concurrency=settings.LLM_MAX_CONCURRENCY,
+            timeout=settings.LLM_TIMEOUT,
+            deadline=settings.LLM_DEADLINE,
+            max_retries=settings.LLM_MAX_RETRIES,
+            breaker_threshold=settings.LLM_BREAKER_THRESHOLD,
+            breaker_reset=settings.LLM_BREAKER_RESET
         )
 
-    def generate_answer(self, query: str, search_results: List[Any]) -> str:
+    async def generate_answer(self, query: str, search_results: List[Any]) -> str:
         """
         Generates an answer based on the provided query and retrieved search results.
+        Raises LLMGatewayError if the LLM is unavailable.
         """
         if not search_results:
             return "Sorry, no relevant information found in the database to answer your question."
 
-        # 1. Format context from search results
-        context = format_search_results(search_results)
+        # 1. Build context from search results (merged, deduplicated, token-budgeted)
+        context = build_context(search_results, token_budget=settings.CONTEXT_TOKEN_BUDGET)
 
         # 2. Construct Prompt
         system_prompt = (
@@ -35,17 +38,12 @@ class TyphoonRAGService:
         
         user_prompt = f"Context:\n{context}\n\nQuestion: {query}"
 
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                max_tokens=1024,
-                temperature=0.4 # Lower temperature for more factual RAG
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            print(f"❌ LLM Error: {e}")
-            return f"Error processing answer: {str(e)}"
\ No newline at end of file
+        # 3. Call the LLM through the gateway (identical in-flight questions share one upstream call)
+        return await self.gateway.complete(
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            max_tokens=1024,
+            temperature=0.4 # Lower temperature for more factual RAG
+        )
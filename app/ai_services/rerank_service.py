@@ -0,0 +1,22 @@
+from typing import List, Any
+from sentence_transformers import CrossEncoder
+
+class CrossEncoderReranker:
+    def __init__(self, model: CrossEncoder):
+        """
+        Re-scores vector-search candidates with a local cross-encoder (e.g. BAAI/bge-reranker-v2-m3).
+        """
+        self.model = model
+
+    def rerank(self, query: str, points: List[Any], top_k: int, batch_size: int = 16) -> List[Any]:
+        """
+        Returns the `top_k` best points by cross-encoder score; `score` is replaced by the reranker score.
+        Points need the `text` payload field.
+        """
+        if not points:
+            return []
+
+        pairs = [(query, (point.payload or {}).get("text", "")) for point in points]
+        scores = self.model.predict(pairs, batch_size=batch_size, show_progress_bar=False)
+        ranked = sorted(zip(points, scores), key=lambda item: item[1], reverse=True)[:top_k]
+        return [point.model_copy(update={"score": float(score)}) for point, score in ranked]
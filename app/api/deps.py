@@ -1,19 +1,26 @@
 from functools import lru_cache
+from typing import Optional, Union
 from fastapi import Depends
 from qdrant_client import QdrantClient
-from sentence_transformers import SentenceTransformer
+from sentence_transformers import SentenceTransformer, CrossEncoder
 
 from app.core.config import settings
+from app.core.compute import ComputeScheduler
 
 # Import Service Classes
 from app.services.ingestion_service import IngestionService
 from app.services.search_service import SearchService
+from app.services.reindex_service import ReindexService
 
 # Import Wrappers / Helpers
 from app.ai_services.ocr_service import DoclingParser
 from app.ai_services.embeding_service import BGEEmbedding
+from app.ai_services.embedding_client import RemoteBGEEmbedding
 from app.ai_services.llm_service import TyphoonRAGService
+from app.ai_services.rerank_service import CrossEncoderReranker
 from app.db.qdrant_service import QdrantService
+from app.db.base import VectorStore
+from app.db.local_vector_store import LocalVectorStore
 
 # ==========================================
 # Level 1: Low-Level Clients (Singletons)
@@ -21,12 +28,25 @@ from app.db.qdrant_service import QdrantService
 
 @lru_cache()
 def get_qdrant_client() -> QdrantClient:
+    if settings.QDRANT_PATH:
+        print(f"💾 Using Qdrant local mode at {settings.QDRANT_PATH}...")
+        return QdrantClient(path=settings.QDRANT_PATH)
     print(f"🔌 Connecting to Qdrant at {settings.QDRANT_URL}...")
     return QdrantClient(
         url=settings.QDRANT_URL,
         api_key=settings.QDRANT_API_KEY
     )
 
+@lru_cache()
+def get_compute_scheduler() -> ComputeScheduler:
+    return ComputeScheduler(
+        query_workers=settings.QUERY_WORKERS,
+        query_threads=settings.QUERY_THREADS,
+        ingest_workers=settings.INGEST_WORKERS,
+        ingest_threads=settings.INGEST_THREADS,
+        yield_timeout=settings.INGEST_YIELD_TIMEOUT
+    )
+
 @lru_cache()
 def get_embedding_model_raw() -> SentenceTransformer:
     print(f"🧠 Loading AI Model: {settings.MODEL_NAME} ...")
@@ -44,30 +64,64 @@ def get_parser() -> DoclingParser:
 def get_llm() -> TyphoonRAGService:
     return TyphoonRAGService()
 
-def get_embedder(
-    model_raw: SentenceTransformer = Depends(get_embedding_model_raw)
-) -> BGEEmbedding:
-    return BGEEmbedding(model=model_raw)
+@lru_cache()
+def get_reranker() -> Optional[CrossEncoderReranker]:
+    if not settings.RERANK_MODEL:
+        return None
+    print(f"🧠 Loading Reranker: {settings.RERANK_MODEL} ...")
+    return CrossEncoderReranker(CrossEncoder(settings.RERANK_MODEL))
+
+@lru_cache()
+def get_remote_embedder() -> RemoteBGEEmbedding:
+    print(f"🔌 Using shared embedding server at {settings.EMBEDDING_SOCKET}...")
+    return RemoteBGEEmbedding(socket_path=settings.EMBEDDING_SOCKET)
+
+def get_embedder() -> Union[BGEEmbedding, RemoteBGEEmbedding]:
+    # Remote mode never loads the model in this worker process
+    if settings.EMBEDDING_MODE == "remote":
+        return get_remote_embedder()
+    return BGEEmbedding(model=get_embedding_model_raw())
 
 def get_qdrant_service(
     client: QdrantClient = Depends(get_qdrant_client)
 ) -> QdrantService:
     return QdrantService(client=client)
 
+@lru_cache()
+def get_local_vector_store() -> LocalVectorStore:
+    print(f"💾 Using embedded vector store at {settings.LOCAL_VECTOR_PATH}...")
+    return LocalVectorStore(path=settings.LOCAL_VECTOR_PATH, hnsw_threshold=settings.LOCAL_HNSW_THRESHOLD)
+
+def get_vector_store() -> VectorStore:
+    # Resolved lazily so the local backend never opens a Qdrant connection
+    if settings.VECTOR_BACKEND == "local":
+        return get_local_vector_store()
+    return QdrantService(client=get_qdrant_client())
+
 # ==========================================
 # Level 3: High-Level Services (Inject Wrappers here)
 # ==========================================
 
 def get_ingestion_service(
     parser: DoclingParser = Depends(get_parser),
-    embedder: BGEEmbedding = Depends(get_embedder),
-    qdrant: QdrantService = Depends(get_qdrant_service)
+    embedder: Union[BGEEmbedding, RemoteBGEEmbedding] = Depends(get_embedder),
+    store: VectorStore = Depends(get_vector_store),
+    scheduler: ComputeScheduler = Depends(get_compute_scheduler)
 ) -> IngestionService:
-    return IngestionService(parser, embedder, qdrant)
+    return IngestionService(parser, embedder, store, scheduler)
 
 def get_search_service(
-    embedder: BGEEmbedding = Depends(get_embedder),
+    embedder: Union[BGEEmbedding, RemoteBGEEmbedding] = Depends(get_embedder),
     llm: TyphoonRAGService = Depends(get_llm),
-    qdrant: QdrantService = Depends(get_qdrant_service)
+    store: VectorStore = Depends(get_vector_store),
+    scheduler: ComputeScheduler = Depends(get_compute_scheduler),
+    reranker: Optional[CrossEncoderReranker] = Depends(get_reranker)
 ) -> SearchService:
-    return SearchService(embedder, llm, qdrant)
+    return SearchService(embedder, llm, store, scheduler, reranker, settings.RERANK_CANDIDATES)
+
+def get_reindex_service(
+    embedder: Union[BGEEmbedding, RemoteBGEEmbedding] = Depends(get_embedder),
+    qdrant: QdrantService = Depends(get_qdrant_service),
+    scheduler: ComputeScheduler = Depends(get_compute_scheduler)
+) -> ReindexService:
+    return ReindexService(embedder, qdrant, scheduler)
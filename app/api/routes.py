@@ -1,51 +1,92 @@
 import os
+import json
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, Response
+from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 
-from app.api.schemas.models import CollectionCreate, SearchRequest, FilterSearchRequest
+from app.api.schemas.models import CollectionCreate, SearchRequest, FilterSearchRequest, PayloadIndexCreate, ReindexRequest, SearchResponse
 from app.services.ingestion_service import IngestionService
 from app.services.search_service import SearchService
-from app.db.qdrant_service import QdrantService
-from app.api.deps import get_ingestion_service, get_search_service, get_qdrant_service
+from app.services.reindex_service import ReindexService
+from app.db.base import VectorStore
+from app.api.deps import get_ingestion_service, get_search_service, get_reindex_service, get_compute_scheduler, get_vector_store
+from app.core.compute import ComputeScheduler
+from app.core.config import settings
 
 router = APIRouter()
 
+def json_response(model: BaseModel) -> Response:
+    # Serialize with pydantic-core directly: skips FastAPI's jsonable_encoder pass over every hit
+    return Response(content=model.model_dump_json(exclude_none=True), media_type="application/json")
+
 # --- Routes ---
 
 @router.get("/health")
 async def health_check():
     return {"status": "healthy", "service": "rag-scb-api"}
 
+@router.get("/metrics/compute")
+async def compute_metrics(
+    scheduler: ComputeScheduler = Depends(get_compute_scheduler)
+):
+    return scheduler.metrics()
+
 @router.get("/collections")
 async def list_collections(
-    service: QdrantService = Depends(get_qdrant_service)
+    service: VectorStore = Depends(get_vector_store)
 ):
     return service.list_collections()
 
 @router.post("/collections")
 async def create_collection(
     config: CollectionCreate,
-    service: QdrantService = Depends(get_qdrant_service)
+    service: VectorStore = Depends(get_vector_store)
 ):
-    service.create_collection(
-        collection_name=config.name,
-        vector_size=config.vector_size,
-        distance_mode=config.distance_mode
-    )
+    try:
+        service.create_collection(
+            collection_name=config.name,
+            vector_size=config.vector_size,
+            distance_mode=config.distance_mode
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return {"status": "success", "message": f"Collection '{config.name}' created or already exists."}
 
 @router.get("/collections/{name}/count")
 async def get_collection_count(
     name: str,
-    service: QdrantService = Depends(get_qdrant_service)
+    service: VectorStore = Depends(get_vector_store)
 ):
     collections = service.list_collections()
+    # Reindexed collections are listed under their alias name
     for col in collections:
         if col["name"] == name:
             return {"collection": name, "points_count": col["points_count"]}
     raise HTTPException(status_code=404, detail="Collection not found")
 
+@router.post("/collections/{name}/reindex")
+async def reindex_collection(
+    name: str,
+    request: ReindexRequest,
+    service: ReindexService = Depends(get_reindex_service)
+):
+    if settings.VECTOR_BACKEND != "qdrant":
+        raise HTTPException(status_code=400, detail="Reindexing requires the Qdrant backend")
+    # Sync generator: Starlette iterates it in a worker thread, keeping the event loop free
+    events = service.reindex(
+        alias=name,
+        distance_mode=request.distance_mode,
+        quantization=request.quantization,
+        batch_size=request.batch_size,
+        max_points_per_second=request.max_points_per_second,
+        drop_source=request.drop_source
+    )
+    return StreamingResponse(
+        (json.dumps(event, ensure_ascii=False) + "\n" for event in events),
+        media_type="application/x-ndjson"
+    )
+
 @router.post("/documents/process")
 async def process_document(
     collection_name: str = Form(...),
@@ -65,33 +106,57 @@ async def process_document(
         media_type="application/x-ndjson"
     )
 
-@router.post("/search")
+@router.post("/search", response_model=SearchResponse)
 async def search(
     request: SearchRequest,
     service: SearchService = Depends(get_search_service)
 ):
-    return await service.search(
+    return json_response(await service.search(
         collection_name=request.collection_name,
         query=request.query,
         limit=request.limit,
         score_threshold=request.score_threshold,
-        ask_ai=request.ask_ai
-    )
+        ask_ai=request.ask_ai,
+        include_fields=request.include_fields,
+        exclude_fields=request.exclude_fields,
+        snippet=request.snippet,
+        snippet_length=request.snippet_length
+    ))
 
-@router.post("/search/filter")
+@router.post("/search/filter", response_model=SearchResponse)
 async def search_filter(
     request: FilterSearchRequest,
     service: SearchService = Depends(get_search_service)
 ):
-    return await service.search_filter(
+    filter_spec = request.filter.model_dump(exclude_none=True) if request.filter else {}
+    # Legacy single key/value filter is folded into the "must" clause
+    if request.filter_key is not None and request.filter_value is not None:
+        filter_spec.setdefault("must", []).append({"key": request.filter_key, "value": request.filter_value})
+    if not any(filter_spec.get(clause) for clause in ("must", "should", "must_not")):
+        raise HTTPException(status_code=422, detail="Provide 'filter' or both 'filter_key' and 'filter_value'")
+
+    return json_response(await service.search_filter(
         collection_name=request.collection_name,
         query=request.query,
-        filter_key=request.filter_key,
-        filter_value=request.filter_value,
+        filter_spec=filter_spec,
         score_threshold=request.score_threshold,
         limit=request.limit,
-        ask_ai=request.ask_ai
-    )
+        ask_ai=request.ask_ai,
+        include_fields=request.include_fields,
+        exclude_fields=request.exclude_fields,
+        snippet=request.snippet,
+        snippet_length=request.snippet_length
+    ))
+
+@router.post("/collections/{name}/indexes")
+async def create_payload_index(
+    name: str,
+    index: PayloadIndexCreate,
+    service: VectorStore = Depends(get_vector_store)
+):
+    if not service.create_index(name, index.field_name, index.field_type):
+        raise HTTPException(status_code=400, detail=f"Could not create index '{index.field_name}' on '{name}'")
+    return {"status": "success", "message": f"Field '{index.field_name}' indexed as {index.field_type}."}
 
 @router.get("/collections/{name}/filters")
 async def get_filters(
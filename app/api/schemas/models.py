@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, model_validator
+from typing import Optional, List, Union, Literal, Dict, Any
 
 # --- Models ---
 class CollectionCreate(BaseModel):
@@ -13,12 +13,79 @@ class SearchRequest(BaseModel):
     limit: int 
     score_threshold: float = 0.0
     ask_ai: bool = False
+    # Response shaping: payload projection (include wins over exclude) and snippet mode
+    include_fields: Optional[List[str]] = None
+    exclude_fields: Optional[List[str]] = None
+    snippet: bool = False
+    snippet_length: int = 200
+
+# --- Filter DSL ---
+class RangeCondition(BaseModel):
+    # Numbers for integer fields (chunk_index), ISO-8601 strings for datetime fields (created_at)
+    gt: Optional[Union[int, float, str]] = None
+    gte: Optional[Union[int, float, str]] = None
+    lt: Optional[Union[int, float, str]] = None
+    lte: Optional[Union[int, float, str]] = None
+
+class FilterCondition(BaseModel):
+    """
+    A single condition on a payload field. Exactly one of `value`, `any` or `range` should be set.
+    """
+    key: str
+    value: Optional[Union[str, int, bool]] = None
+    any: Optional[List[Union[str, int]]] = None
+    range: Optional[RangeCondition] = None
+
+    @model_validator(mode="after")
+    def check_single_operator(self):
+        operators = [op for op in (self.value, self.any, self.range) if op is not None]
+        if len(operators) != 1:
+            raise ValueError(f"Condition on '{self.key}' must set exactly one of 'value', 'any' or 'range'")
+        return self
+
+class FilterSpec(BaseModel):
+    must: List[FilterCondition] = []
+    should: List[FilterCondition] = []
+    must_not: List[FilterCondition] = []
 
 class FilterSearchRequest(BaseModel):
     collection_name: str
     query: str
-    filter_key: str
-    filter_value: str
+    # Legacy single exact-match filter (kept for backward compatibility)
+    filter_key: Optional[str] = None
+    filter_value: Optional[str] = None
+    # Compound filter (must / should / must_not)
+    filter: Optional[FilterSpec] = None
     limit: int 
     score_threshold: float = 0.0
     ask_ai: bool = False
+    include_fields: Optional[List[str]] = None
+    exclude_fields: Optional[List[str]] = None
+    snippet: bool = False
+    snippet_length: int = 200
+
+class PayloadIndexCreate(BaseModel):
+    field_name: str
+    field_type: Literal["keyword", "integer", "float", "bool", "datetime"] = "keyword"
+
+class ReindexRequest(BaseModel):
+    distance_mode: str = "cosine"
+    quantization: Optional[Literal["scalar", "binary"]] = None
+    batch_size: int = 256
+    max_points_per_second: Optional[float] = None
+    # Delete the old collection after the swap. Required for the first reindex of a plain (pre-alias) collection,
+    # which is replaced by the alias of the same name
+    drop_source: bool = False
+
+# --- Responses ---
+class SearchHit(BaseModel):
+    id: Union[str, int]
+    score: float
+    payload: Optional[Dict[str, Any]] = None
+    snippet: Optional[str] = None
+    # [start, end) character offsets of query-term matches within `snippet`
+    highlights: Optional[List[List[int]]] = None
+
+class SearchResponse(BaseModel):
+    results: List[SearchHit]
+    answer: Optional[str] = None
@@ -0,0 +1,168 @@
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Any, Optional
+
+# Work classes
+QUERY = "query"    # Interactive: search-time query encoding
+INGEST = "ingest"  # Background: Docling OCR, bulk chunk embedding, reindexing
+
+
+def detect_cpu_count() -> int:
+    """
+    Cores actually available to this process: CPU affinity, capped by the cgroup (container) CPU quota.
+    """
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:  # Not available on macOS / Windows
+        cores = os.cpu_count() or 1
+
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cores = min(cores, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+
+    return cores
+
+
+_worker = threading.local()
+
+
+def current_work_class() -> Optional[str]:
+    """
+    Work class of the executor the calling thread belongs to (None outside the scheduler's executors).
+    """
+    return getattr(_worker, "work_class", None)
+
+
+def _init_worker(work_class: str, threads: int):
+    """
+    Executor thread initializer. Records the thread's work class and sets its torch thread count:
+    OpenMP thread counts are per calling thread, so each executor's threads get their own
+    intra-op budget (best effort).
+    """
+    _worker.work_class = work_class
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except (ImportError, RuntimeError):
+        pass
+
+
+class ComputeScheduler:
+    """
+    Separate executors for interactive and background CPU work.
+    - query work runs on its own pool with the larger thread budget;
+    - ingest work runs on a smaller pool and calls `yield_to_interactive()` between
+      batches, pausing while query work is queued or running;
+    - queue depth, running tasks and wait times are tracked per class.
+    """
+
+    def __init__(
+        self,
+        query_workers: int,
+        query_threads: int,
+        ingest_workers: int,
+        ingest_threads: int,
+        yield_timeout: float = 5.0
+    ):
+        self.yield_timeout = yield_timeout
+        self._executors = {
+            QUERY: ThreadPoolExecutor(query_workers, thread_name_prefix="compute-query",
+                                      initializer=_init_worker, initargs=(QUERY, query_threads)),
+            INGEST: ThreadPoolExecutor(ingest_workers, thread_name_prefix="compute-ingest",
+                                       initializer=_init_worker, initargs=(INGEST, ingest_threads)),
+        }
+        self._budgets = {
+            QUERY: {"workers": query_workers, "threads": query_threads},
+            INGEST: {"workers": ingest_workers, "threads": ingest_threads},
+        }
+        self._lock = threading.Lock()
+        self._query_idle = threading.Condition(self._lock)
+        self._stats = {
+            work_class: {"queued": 0, "running": 0, "completed": 0, "yielded": 0.0, "wait_times": deque(maxlen=1000)}
+            for work_class in self._executors
+        }
+
+    async def run(self, work_class: str, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Runs a blocking callable on the executor of `work_class` without blocking the event loop.
+        """
+        return await asyncio.wrap_future(self._submit(work_class, fn, *args, **kwargs))
+
+    def run_sync(self, work_class: str, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Same as `run` for synchronous callers (e.g. generators streamed from Starlette's threadpool):
+        blocks the calling thread until the task finishes. Must not be called from one of the executors.
+        """
+        return self._submit(work_class, fn, *args, **kwargs).result()
+
+    def _submit(self, work_class: str, fn: Callable, *args, **kwargs) -> Future:
+        stats = self._stats[work_class]
+        enqueued_at = time.perf_counter()
+        with self._lock:
+            stats["queued"] += 1
+
+        def task():
+            with self._lock:
+                stats["queued"] -= 1
+                stats["running"] += 1
+                stats["wait_times"].append(time.perf_counter() - enqueued_at)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    stats["running"] -= 1
+                    stats["completed"] += 1
+                    if work_class == QUERY and not self._query_busy():
+                        self._query_idle.notify_all()
+
+        return self._executors[work_class].submit(task)
+
+    def _query_busy(self) -> bool:
+        stats = self._stats[QUERY]
+        return stats["queued"] > 0 or stats["running"] > 0
+
+    def yield_to_interactive(self):
+        """
+        Called by background work between batches: blocks while query work is pending,
+        for at most `yield_timeout` seconds so ingestion cannot starve completely.
+        """
+        started = time.monotonic()
+        deadline = started + self.yield_timeout
+        with self._query_idle:
+            while self._query_busy():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._query_idle.wait(remaining)
+            self._stats[INGEST]["yielded"] += time.monotonic() - started
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        result = {}
+        with self._lock:
+            for work_class, stats in self._stats.items():
+                waits = sorted(stats["wait_times"])
+                result[work_class] = {
+                    **self._budgets[work_class],
+                    "queue_depth": stats["queued"],
+                    "running": stats["running"],
+                    "completed": stats["completed"],
+                    "wait_ms_p50": round(waits[len(waits) // 2] * 1000, 2) if waits else 0.0,
+                    "wait_ms_p95": round(waits[int(len(waits) * 0.95)] * 1000, 2) if waits else 0.0,
+                    "wait_ms_max": round(waits[-1] * 1000, 2) if waits else 0.0,
+                    # Time background work spent paused for interactive work
+                    "yielded_ms_total": round(stats["yielded"] * 1000, 2),
+                }
+        return result
+
+    def shutdown(self):
+        for executor in self._executors.values():
+            executor.shutdown(wait=False)
@@ -1,12 +1,54 @@
 # config.py
 import os
 from dotenv import load_dotenv
+from app.core.compute import detect_cpu_count
 
 load_dotenv() 
 
 class Settings:
     QDRANT_URL = f"http://{os.getenv('QDRANT_HOST', 'localhost')}:{os.getenv('QDRANT_PORT', '6333')}"
     QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
+    # Set to a directory to run Qdrant in local mode (embedded, no server), e.g. for offline evaluation
+    QDRANT_PATH = os.getenv("QDRANT_PATH")
     MODEL_NAME = os.getenv("MODEL_NAME", "BAAI/bge-m3")
+    # Optional cross-encoder (e.g. BAAI/bge-reranker-v2-m3) that reranks the top RERANK_CANDIDATES vector hits
+    RERANK_MODEL = os.getenv("RERANK_MODEL", "")
+    RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "50"))
+    # "qdrant": Qdrant server; "local": embedded NumPy store under LOCAL_VECTOR_PATH (no server needed)
+    VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "qdrant")
+    LOCAL_VECTOR_PATH = os.getenv("LOCAL_VECTOR_PATH", "./vector_store")
+    LOCAL_HNSW_THRESHOLD = int(os.getenv("LOCAL_HNSW_THRESHOLD", "20000"))
+    # "local": each worker loads the model; "remote": use the shared embedding server
+    EMBEDDING_MODE = os.getenv("EMBEDDING_MODE", "local")
+    EMBEDDING_SOCKET = os.getenv("EMBEDDING_SOCKET", "/tmp/rag-embedding.sock")
+    EMBEDDING_SERVER_THREADS = int(os.getenv("EMBEDDING_SERVER_THREADS", "0"))  # 0 = all cores
+    # Compute scheduling (CPU cores are auto-detected unless COMPUTE_CORES is set)
+    COMPUTE_CORES = int(os.getenv("COMPUTE_CORES", "0")) or detect_cpu_count()
+    QUERY_WORKERS = int(os.getenv("QUERY_WORKERS", "2"))
+    # Both classes default to all cores: ingestion pauses between batches while query work is pending
+    # (ComputeScheduler.yield_to_interactive), so it only has the CPU to itself when no query needs it
+    QUERY_THREADS = int(os.getenv("QUERY_THREADS", "0")) or COMPUTE_CORES
+    INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "1"))
+    INGEST_THREADS = int(os.getenv("INGEST_THREADS", "0")) or COMPUTE_CORES
+    # Max seconds a background batch waits for pending query work before running anyway
+    INGEST_YIELD_TIMEOUT = float(os.getenv("INGEST_YIELD_TIMEOUT", "5"))
+
+    # Checkpoints of collection reindex jobs (for resuming after a crash)
+    REINDEX_STATE_DIR = os.getenv("REINDEX_STATE_DIR", ".reindex")
+    # Reports written by the evaluation harness (python -m app.services.evaluation_service)
+    EVAL_REPORT_DIR = os.getenv("EVAL_REPORT_DIR", "eval_reports")
+    # Max (estimated) tokens of retrieved context sent to the LLM per answer
+    CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000"))
+
+    # LLM gateway (OpenAI-compatible endpoint)
+    LLM_API_KEY = os.getenv("OPENAI_API_KEY")
+    LLM_BASE_URL = os.getenv("LLM_BASE_URL", "https://api.opentyphoon.ai/v1")
+    LLM_MODEL = os.getenv("LLM_MODEL", "typhoon-v2.5-30b-a3b-instruct")
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+    LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))      # seconds per attempt
+    LLM_DEADLINE = float(os.getenv("LLM_DEADLINE", "60"))    # seconds per call, all retries included
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+    LLM_BREAKER_THRESHOLD = int(os.getenv("LLM_BREAKER_THRESHOLD", "5"))
+    LLM_BREAKER_RESET = float(os.getenv("LLM_BREAKER_RESET", "30"))
 
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,64 @@
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Optional, Union
+
+PayloadSelector = Union[bool, Dict[str, List[str]]]
+
+
+class VectorStore(ABC):
+    """
+    Backend-neutral vector store used by the services.
+    Implementations: QdrantService (Qdrant server / local mode) and LocalVectorStore (embedded NumPy).
+
+    Search methods return hits exposing `.id`, `.score` and `.payload` (qdrant_client ScoredPoint).
+    Filters use the backend-neutral spec {"must": [...], "should": [...], "must_not": [...]}
+    where each condition is {"key", "value" | "any" | "range"}.
+    Payload projection (`with_payload`): True / False, or {"include": [...]} / {"exclude": [...]}.
+    """
+
+    @abstractmethod
+    def create_collection(self, collection_name: str, vector_size: int = 1024, distance_mode: str = "cosine"):
+        ...
+
+    @abstractmethod
+    def upsert_data(self, collection_name: str, vectors: List[List[float]], payloads: List[Dict[str, Any]]):
+        ...
+
+    @abstractmethod
+    def search_similarity(
+        self,
+        collection_name: str,
+        query_vector: List[float],
+        limit: int,
+        score_threshold: float = 0.0,
+        with_payload: PayloadSelector = True
+    ):
+        ...
+
+    @abstractmethod
+    def search_with_filter(
+        self,
+        collection_name: str,
+        query_vector: List[float],
+        filter_spec: Dict[str, List[Dict[str, Any]]],
+        limit: int,
+        score_threshold: float = 0.0,
+        with_payload: PayloadSelector = True
+    ):
+        ...
+
+    @abstractmethod
+    def get_available_filters(self, collection_name: str) -> List[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def list_collections(self) -> List[Dict[str, Any]]:
+        ...
+
+    def create_index(self, collection_name: str, field_name: str, field_schema: str) -> bool:
+        """
+        Declare a payload field as filterable. Backends without payload indexes accept it as a no-op.
+        """
+        return True
+
+    def resolve_alias(self, alias_name: str) -> Optional[str]:
+        return None
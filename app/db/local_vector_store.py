@@ -0,0 +1,514 @@
+import datetime
+import json
+import os
+import re
+import shutil
+import threading
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+from qdrant_client import models
+
+from app.db.base import VectorStore, PayloadSelector
+from app.utils.helpers import generate_point_id
+
+try:
+    import hnswlib
+except ImportError:  # Optional: exact search only
+    hnswlib = None
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Rows pre-allocated when a collection's vector file is created / grown
+INITIAL_CAPACITY = 1024
+# Collection names become directory names: no separators, dots or other path syntax
+COLLECTION_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,128}$")
+# Payload fields kept only in the on-disk payload log, not in the in-memory filter columns
+BLOB_FIELDS = {"text"}
+# Logs are rewritten with live rows only once they hold this many times more lines than rows
+COMPACT_RATIO = 2
+
+
+class _Collection:
+    """
+    One collection on disk:
+    - vectors.f32          float32 memmap (capacity x dim), normalized when distance is cosine
+    - payloads-<gen>.jsonl append-only log of full payloads, one line per upserted point
+    - columns-<gen>.jsonl  append-only log of each row's id, small fields (no BLOB_FIELDS) and payload line
+                           location; replayed into in-memory columns on open
+    - meta.json            vector size, distance, row count, capacity, log generation
+    Upserts only append to the logs. Compaction writes generation <gen+1> and switches to it by
+    rewriting meta.json, so a crash at any point leaves a consistent generation behind.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if os.path.exists(os.path.join(path, "columns.json")):
+            self._migrate_columns_json()
+        self.vectors = np.memmap(os.path.join(path, "vectors.f32"), dtype=np.float32, mode="r+",
+                                 shape=(self.meta["capacity"], self.meta["vector_size"]))
+        # (offset, length) of each row's current line in the payload log
+        self.locations = np.zeros((self.meta["capacity"], 2), dtype=np.int64)
+        self.columns: Dict[str, List[Any]] = {"_id": [None] * self.count}
+        self._replay_columns()
+        self.row_of = {point_id: row for row, point_id in enumerate(self.columns["_id"])}
+        self._reader = open(self._log_path("payloads"), "rb")
+        self.hnsw = None
+        self.hnsw_pending: List[int] = []
+        self._column_cache: Dict[str, np.ndarray] = {}
+
+    @staticmethod
+    def create(path: str, vector_size: int, distance: str):
+        os.makedirs(path)
+        np.memmap(os.path.join(path, "vectors.f32"), dtype=np.float32, mode="w+", shape=(INITIAL_CAPACITY, vector_size)).flush()
+        for name in ("payloads", "columns"):
+            open(os.path.join(path, f"{name}-0.jsonl"), "wb").close()
+        _write_json(os.path.join(path, "meta.json"), {
+            "vector_size": vector_size,
+            "distance": distance,
+            "count": 0,
+            "capacity": INITIAL_CAPACITY,
+            "generation": 0,
+            "log_rows": 0,
+            "created_at": datetime.datetime.now().isoformat()
+        })
+
+    @property
+    def count(self) -> int:
+        return self.meta["count"]
+
+    def _log_path(self, name: str, generation: Optional[int] = None) -> str:
+        generation = self.meta["generation"] if generation is None else generation
+        return os.path.join(self.path, f"{name}-{generation}.jsonl")
+
+    def _replay_columns(self):
+        with open(self._log_path("columns"), "rb") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break  # Torn tail of an interrupted upsert
+                row = record.pop("_row")
+                if row < self.count:  # Rows of an upsert that never committed meta.json are ignored
+                    self.locations[row] = record.pop("_loc")
+                    self._set_row(row, record)
+
+    def _set_row(self, row: int, fields: Dict[str, Any]):
+        # Full overwrite like Qdrant upsert: clear fields the new payload no longer has
+        for key, column in self.columns.items():
+            if key != "_id":
+                column[row] = None
+        for key, value in fields.items():
+            if key not in self.columns:
+                self.columns[key] = [None] * self.count
+            self.columns[key][row] = value
+
+    def _grow(self, needed: int):
+        capacity = self.meta["capacity"]
+        while capacity < needed:
+            capacity *= 2
+        vector_path = os.path.join(self.path, "vectors.f32")
+        self.vectors.flush()
+        del self.vectors
+        with open(vector_path, "r+b") as f:
+            f.truncate(capacity * self.meta["vector_size"] * 4)
+        self.meta["capacity"] = capacity
+        self.vectors = np.memmap(vector_path, dtype=np.float32, mode="r+", shape=(capacity, self.meta["vector_size"]))
+        self.locations = np.concatenate([self.locations, np.zeros((capacity - len(self.locations), 2), dtype=np.int64)])
+
+    def upsert(self, ids: List[str], vectors: np.ndarray, payloads: List[Dict[str, Any]]):
+        if self.meta["distance"] == "cosine":
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.where(norms == 0, 1, norms)
+
+        new_ids = [point_id for point_id in dict.fromkeys(ids) if point_id not in self.row_of]
+        if self.count + len(new_ids) > self.meta["capacity"]:
+            self._grow(self.count + len(new_ids))
+
+        for point_id in new_ids:
+            self.row_of[point_id] = self.meta["count"]
+            self.meta["count"] += 1
+            for column in self.columns.values():
+                column.append(None)
+
+        rows = [self.row_of[point_id] for point_id in ids]
+        self.vectors[rows] = vectors
+
+        # Payload lines first, then the column records pointing at them; meta.json (row count) commits the upsert
+        payload_lines, column_lines = [], []
+        with open(self._log_path("payloads"), "ab") as f:
+            offset = f.tell()
+            for row, point_id, payload in zip(rows, ids, payloads):
+                line = json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n"
+                payload_lines.append(line)
+                self.locations[row] = (offset, len(line))
+                offset += len(line)
+                fields = {"_id": point_id, **{k: v for k, v in payload.items() if k not in BLOB_FIELDS}}
+                self._set_row(row, fields)
+                column_lines.append(self._column_line(row, fields))
+            f.write(b"".join(payload_lines))
+        with open(self._log_path("columns"), "ab") as f:
+            f.write(b"".join(column_lines))
+        self.meta["log_rows"] += len(ids)
+
+        if self.hnsw is not None:
+            # Without an index the whole collection is added when it is first built
+            self.hnsw_pending.extend(rows)
+        self._column_cache.clear()
+        self.flush()
+        if self.meta["log_rows"] > COMPACT_RATIO * self.count + INITIAL_CAPACITY:
+            self._compact()
+
+    def _column_line(self, row: int, fields: Dict[str, Any]) -> bytes:
+        record = {"_row": row, "_loc": self.locations[row].tolist(), **fields}
+        return json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"
+
+    def _compact(self):
+        """
+        Rewrites both logs with the current version of each row only (re-upserted points leave dead lines behind).
+        """
+        generation = self.meta["generation"] + 1
+        locations = np.zeros_like(self.locations)
+        with open(self._log_path("payloads", generation), "wb") as f:
+            offset = 0
+            for row in range(self.count):
+                line = self._read_line(row)
+                f.write(line)
+                locations[row] = (offset, len(line))
+                offset += len(line)
+        self.locations = locations
+        with open(self._log_path("columns", generation), "wb") as f:
+            for row in range(self.count):
+                fields = {key: column[row] for key, column in self.columns.items() if column[row] is not None}
+                f.write(self._column_line(row, fields))
+
+        previous = self.meta["generation"]
+        self.meta.update(generation=generation, log_rows=self.count)
+        self.flush()
+        self._reader.close()
+        self._reader = open(self._log_path("payloads"), "rb")
+        for name in ("payloads", "columns"):
+            os.remove(self._log_path(name, previous))
+
+    def _migrate_columns_json(self):
+        """
+        Converts a store written with the former single columns.json file to the log layout.
+        """
+        with open(os.path.join(self.path, "columns.json"), "r", encoding="utf-8") as f:
+            columns = json.load(f)
+        with open(os.path.join(self.path, "payloads-0.jsonl"), "wb") as payload_log, \
+                open(os.path.join(self.path, "columns-0.jsonl"), "wb") as column_log:
+            offset = 0
+            for row in range(self.meta["count"]):
+                payload = {key: column[row] for key, column in columns.items() if key != "_id" and column[row] is not None}
+                line = json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n"
+                payload_log.write(line)
+                fields = {"_id": columns["_id"][row], **{k: v for k, v in payload.items() if k not in BLOB_FIELDS}}
+                record = {"_row": row, "_loc": [offset, len(line)], **fields}
+                column_log.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+                offset += len(line)
+        self.meta.update(generation=0, log_rows=self.meta["count"])
+        _write_json(os.path.join(self.path, "meta.json"), self.meta)
+        os.remove(os.path.join(self.path, "columns.json"))
+
+    def flush(self):
+        self.vectors.flush()
+        _write_json(os.path.join(self.path, "meta.json"), self.meta)
+
+    def close(self):
+        self._reader.close()
+
+    def _read_line(self, row: int) -> bytes:
+        offset, length = self.locations[row].tolist()
+        self._reader.seek(offset)
+        return self._reader.read(length)
+
+    def column(self, key: str) -> np.ndarray:
+        """
+        Column as an object array (None where the payload has no such key), cached until the next upsert.
+        BLOB_FIELDS are read from the payload log (slow path; they are not meant for filtering).
+        """
+        if key not in self._column_cache:
+            values = np.empty(self.count, dtype=object)
+            if key in BLOB_FIELDS:
+                values[:] = [json.loads(self._read_line(row)).get(key) for row in range(self.count)]
+            else:
+                values[:] = self.columns.get(key, [None] * self.count)
+            self._column_cache[key] = values
+        return self._column_cache[key]
+
+    def payload(self, row: int, with_payload: PayloadSelector = True) -> Optional[Dict[str, Any]]:
+        if with_payload is False:
+            return None
+        include = with_payload.get("include") if isinstance(with_payload, dict) else None
+        excluded = set(with_payload.get("exclude", [])) if isinstance(with_payload, dict) else set()
+
+        # Only hit the payload log when a blob field (chunk text) is actually requested
+        if (include is not None and BLOB_FIELDS & set(include)) or (include is None and not BLOB_FIELDS <= excluded):
+            fields = json.loads(self._read_line(row))
+        else:
+            fields = {key: column[row] for key, column in self.columns.items() if key != "_id" and column[row] is not None}
+
+        if include is not None:
+            return {key: fields[key] for key in include if key in fields}
+        return {key: value for key, value in fields.items() if key not in excluded}
+
+
+def _write_json(path: str, data: Any):
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+
+
+def _lock_store(path: str):
+    """
+    Takes an exclusive lock on the store directory for the lifetime of the process.
+    Every process keeps its own in-memory columns and would overwrite the others' writes.
+    """
+    lock_file = open(os.path.join(path, ".lock"), "a+")
+    try:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        lock_file.close()
+        raise RuntimeError(
+            f"Local vector store '{path}' is already open in another process. VECTOR_BACKEND=local is "
+            f"single-process: run uvicorn with one worker, or use Qdrant for multiple workers."
+        )
+    return lock_file
+
+
+def _range_bound(value: Any) -> Any:
+    if isinstance(value, str):
+        parsed = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+        # Compare in UTC like Qdrant; naive timestamps are taken as UTC
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        return parsed
+    return value
+
+
+class LocalVectorStore(VectorStore):
+    """
+    Embedded, in-process vector store for edge deployments and tests (no Qdrant server).
+    Single-process only: the directory is locked while open, so a second process (e.g. another
+    uvicorn worker) fails to open it instead of silently overwriting its writes.
+    Exact search is a single matrix-vector product over the memory-mapped vectors;
+    collections larger than `hnsw_threshold` use an HNSW index when hnswlib is installed.
+    """
+
+    def __init__(self, path: str, hnsw_threshold: int = 20000):
+        self.path = path
+        self.hnsw_threshold = hnsw_threshold
+        self._collections: Dict[str, _Collection] = {}
+        self._lock = threading.RLock()
+        os.makedirs(path, exist_ok=True)
+        self._process_lock = _lock_store(path)
+
+    def _collection_path(self, collection_name: str) -> str:
+        if not COLLECTION_NAME_PATTERN.fullmatch(collection_name):
+            raise ValueError(f"Invalid collection name '{collection_name}': use 1-128 letters, digits, '_' or '-'")
+        return os.path.join(self.path, collection_name)
+
+    def _get(self, collection_name: str) -> _Collection:
+        if collection_name not in self._collections:
+            collection_path = self._collection_path(collection_name)
+            if not os.path.exists(os.path.join(collection_path, "meta.json")):
+                raise KeyError(f"Collection '{collection_name}' not found")
+            self._collections[collection_name] = _Collection(collection_path)
+        return self._collections[collection_name]
+
+    def create_collection(self, collection_name: str, vector_size: int = 1024, distance_mode: str = "cosine"):
+        with self._lock:
+            collection_path = self._collection_path(collection_name)
+            if os.path.exists(collection_path):
+                print(f"⚠️ Collection '{collection_name}' already exists.")
+                return
+            distance = distance_mode if distance_mode in ("cosine", "dot", "euclid") else "cosine"
+            _Collection.create(collection_path, vector_size, distance)
+            print(f"✅ Collection '{collection_name}' created successfully.")
+
+    def delete_collection(self, collection_name: str):
+        with self._lock:
+            collection_path = self._collection_path(collection_name)
+            collection = self._collections.pop(collection_name, None)
+            if collection is not None:
+                collection.close()
+            shutil.rmtree(collection_path, ignore_errors=True)
+
+    def upsert_data(self, collection_name: str, vectors: List[List[float]], payloads: List[Dict[str, Any]]):
+        try:
+            with self._lock:
+                collection = self._get(collection_name)
+                collection.upsert(
+                    ids=[generate_point_id(payload) for payload in payloads],
+                    vectors=np.asarray(vectors, dtype=np.float32),
+                    payloads=payloads
+                )
+            print(f"✅ Upserted {len(payloads)} points. Status: completed")
+        except Exception as e:
+            print(f"❌ Upsert Failed: {e}")
+
+    # --- Search ---
+
+    def _scores(self, collection: _Collection, query: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        vectors = collection.vectors[:collection.count] if rows is None else collection.vectors[rows]
+        if collection.meta["distance"] == "euclid":
+            # Negated distance so higher is better everywhere
+            return -np.linalg.norm(vectors - query, axis=1)
+        return vectors @ query
+
+    def _query_vector(self, collection: _Collection, query_vector: List[float]) -> np.ndarray:
+        query = np.asarray(query_vector, dtype=np.float32)
+        if collection.meta["distance"] == "cosine":
+            norm = np.linalg.norm(query)
+            query = query / norm if norm else query
+        return query
+
+    def _hnsw_search(self, collection: _Collection, query: np.ndarray, limit: int):
+        space = {"cosine": "ip", "dot": "ip", "euclid": "l2"}[collection.meta["distance"]]
+        if collection.hnsw is None:
+            collection.hnsw = hnswlib.Index(space=space, dim=collection.meta["vector_size"])
+            collection.hnsw.init_index(max_elements=collection.meta["capacity"], ef_construction=200, M=16)
+            collection.hnsw_pending = list(range(collection.count))
+        if collection.hnsw_pending:
+            if collection.meta["capacity"] > collection.hnsw.get_max_elements():
+                collection.hnsw.resize_index(collection.meta["capacity"])
+            rows = np.unique(collection.hnsw_pending)
+            collection.hnsw.add_items(collection.vectors[rows], rows)
+            collection.hnsw_pending = []
+        collection.hnsw.set_ef(max(limit * 4, 64))
+        labels, distances = collection.hnsw.knn_query(query, k=min(limit, collection.count))
+        scores = 1 - distances[0] if space == "ip" else -np.sqrt(distances[0])
+        return labels[0].astype(np.int64), scores
+
+    def _top_k(self, collection: _Collection, query: np.ndarray, limit: int, rows: Optional[np.ndarray] = None):
+        if rows is None and hnswlib is not None and collection.count >= self.hnsw_threshold:
+            return self._hnsw_search(collection, query, limit)
+
+        scores = self._scores(collection, query, rows)
+        if len(scores) > limit:
+            top = np.argpartition(-scores, limit)[:limit]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top])]
+        return (top if rows is None else rows[top]), scores[top]
+
+    def _to_points(self, collection: _Collection, rows: np.ndarray, scores: np.ndarray, score_threshold: float,
+                   with_payload: PayloadSelector = True):
+        return [
+            models.ScoredPoint(id=collection.columns["_id"][row], version=0, score=float(score),
+                               payload=collection.payload(row, with_payload))
+            for row, score in zip(rows.tolist(), scores.tolist())
+            if score >= score_threshold
+        ]
+
+    def search_similarity(
+        self,
+        collection_name: str,
+        query_vector: List[float],
+        limit: int,
+        score_threshold: float = 0.0,
+        with_payload: PayloadSelector = True
+    ):
+        try:
+            with self._lock:
+                collection = self._get(collection_name)
+                if collection.count == 0:
+                    return []
+                rows, scores = self._top_k(collection, self._query_vector(collection, query_vector), limit)
+                return self._to_points(collection, rows, scores, score_threshold, with_payload)
+        except Exception as e:
+            print(f"❌ Search Failed: {e}")
+            return []
+
+    def search_with_filter(
+        self,
+        collection_name: str,
+        query_vector: List[float],
+        filter_spec: Dict[str, List[Dict[str, Any]]],
+        limit: int,
+        score_threshold: float = 0.0,
+        with_payload: PayloadSelector = True
+    ):
+        try:
+            with self._lock:
+                collection = self._get(collection_name)
+                rows = np.flatnonzero(self._filter_mask(collection, filter_spec))
+                if len(rows) == 0:
+                    return []
+                rows, scores = self._top_k(collection, self._query_vector(collection, query_vector), limit, rows)
+                return self._to_points(collection, rows, scores, score_threshold, with_payload)
+        except Exception as e:
+            print(f"❌ Filter Search Failed: {e}")
+            return []
+
+    # --- Filters ---
+
+    def _condition_mask(self, collection: _Collection, condition: Dict[str, Any]) -> np.ndarray:
+        values = collection.column(condition["key"])
+        if condition.get("any") is not None:
+            allowed = set(condition["any"])
+            return np.fromiter((v in allowed for v in values), dtype=bool, count=len(values))
+        if condition.get("range") is not None:
+            bounds = {op: _range_bound(v) for op, v in condition["range"].items() if v is not None}
+            parse = (lambda v: _range_bound(v) if isinstance(v, str) else None) \
+                if any(isinstance(b, datetime.datetime) for b in bounds.values()) \
+                else (lambda v: v if isinstance(v, (int, float)) and not isinstance(v, bool) else None)
+            checks = {"gt": lambda a, b: a > b, "gte": lambda a, b: a >= b, "lt": lambda a, b: a < b, "lte": lambda a, b: a <= b}
+
+            def in_range(value):
+                parsed = parse(value) if value is not None else None
+                return parsed is not None and all(checks[op](parsed, bound) for op, bound in bounds.items())
+
+            return np.fromiter((in_range(v) for v in values), dtype=bool, count=len(values))
+        if condition.get("value") is not None:
+            return values == condition["value"]
+        raise ValueError(f"Filter condition on '{condition['key']}' needs one of 'value', 'any' or 'range'")
+
+    def _filter_mask(self, collection: _Collection, filter_spec: Dict[str, List[Dict[str, Any]]]) -> np.ndarray:
+        mask = np.ones(collection.count, dtype=bool)
+        for condition in filter_spec.get("must") or []:
+            mask &= self._condition_mask(collection, condition)
+        should = filter_spec.get("should") or []
+        if should:
+            any_mask = np.zeros(collection.count, dtype=bool)
+            for condition in should:
+                any_mask |= self._condition_mask(collection, condition)
+            mask &= any_mask
+        for condition in filter_spec.get("must_not") or []:
+            mask &= ~self._condition_mask(collection, condition)
+        return mask
+
+    # --- Collections ---
+
+    def get_available_filters(self, collection_name: str):
+        try:
+            with self._lock:
+                types, counts = np.unique(
+                    [t for t in self._get(collection_name).column("type") if t is not None], return_counts=True
+                )
+            result = [{"name": name, "count": int(count)} for name, count in zip(types.tolist(), counts.tolist())]
+            result.sort(key=lambda item: item["count"], reverse=True)
+            print(f"✅ Found types: {result}")
+            return result
+        except Exception as e:
+            print(f"❌ Error fetching filters: {e}")
+            return []
+
+    def list_collections(self) -> List[Dict[str, Any]]:
+        collections_info = []
+        with self._lock:
+            for name in sorted(os.listdir(self.path)):
+                if os.path.exists(os.path.join(self.path, name, "meta.json")):
+                    collections_info.append({"name": name, "points_count": self._get(name).count, "status": "green"})
+        print(f"📂 Found {len(collections_info)} collections.")
+        return collections_info
@@ -1,39 +1,124 @@
-from typing import List, Union, Any, Dict
+from typing import List, Union, Any, Dict, Optional
 from qdrant_client import models, QdrantClient
 from qdrant_client.models import PointStruct, VectorParams, Distance
-from app.utils.helpers import generate_id
-import uuid
+from app.utils.helpers import generate_point_id
+from app.db.base import VectorStore, PayloadSelector
 
-class QdrantService:
+# Payload fields indexed on collection creation, with the index type Qdrant should build
+FILTERABLE_FIELDS: Dict[str, models.PayloadSchemaType] = {
+    "source": models.PayloadSchemaType.KEYWORD,
+    "type": models.PayloadSchemaType.KEYWORD,
+    "chunk_index": models.PayloadSchemaType.INTEGER,
+    "created_at": models.PayloadSchemaType.DATETIME,
+}
+
+QUANTIZATION_CONFIGS = {
+    "scalar": models.ScalarQuantization(
+        scalar=models.ScalarQuantizationConfig(type=models.ScalarType.INT8, always_ram=True)
+    ),
+    "binary": models.BinaryQuantization(binary=models.BinaryQuantizationConfig(always_ram=True)),
+}
+
+# collection_name -> {field_name: index_type}, shared across QdrantService instances
+_indexed_fields_cache: Dict[str, Dict[str, str]] = {}
+
+class QdrantService(VectorStore):
     def __init__(self, client: QdrantClient):
         self.client = client
 
     def create_indexes(self, collection_name: str):
         """
-        Create indexes for key fields to improve search performance.
+        Create indexes for all declared filterable fields to improve search performance.
         """
         print(f"⚙️ Creating indexes for '{collection_name}'...")
+        for field_name, field_schema in FILTERABLE_FIELDS.items():
+            self.create_index(collection_name, field_name, field_schema)
+
+    def create_index(self, collection_name: str, field_name: str, field_schema: Union[str, models.PayloadSchemaType]) -> bool:
+        """
+        Declare a payload field as filterable by creating a payload index of the matching type
+        (keyword, integer, float, bool or datetime).
+        """
         try:
-            # 1. Index for filename 
-            self.client.create_payload_index(
-                collection_name=collection_name,
-                field_name="source",
-                field_schema=models.PayloadSchemaType.KEYWORD
-            )
-            # 2. Index for document type
             self.client.create_payload_index(
                 collection_name=collection_name,
-                field_name="type",
-                field_schema=models.PayloadSchemaType.KEYWORD
+                field_name=field_name,
+                field_schema=models.PayloadSchemaType(field_schema)
             )
-            
-            print(f"✅ Indexes created successfully for '{collection_name}'")
-            
+            _indexed_fields_cache.pop(collection_name, None)
+            print(f"✅ Index '{field_name}' ({models.PayloadSchemaType(field_schema).value}) ready for '{collection_name}'")
+            return True
+
         except Exception as e:
             # Index might already exist or other non-critical errors
-            print(f"⚠️ Warning creating indexes: {e}")
+            print(f"⚠️ Warning creating index '{field_name}': {e}")
+            return False
+
+    def get_indexed_fields(self, collection_name: str) -> Dict[str, str]:
+        """
+        Returns {field_name: index_type} for the payload indexes of a collection.
+        Cached per collection to avoid an extra round trip on every filtered search.
+        """
+        if collection_name not in _indexed_fields_cache:
+            try:
+                info = self.client.get_collection(collection_name=collection_name)
+                _indexed_fields_cache[collection_name] = {
+                    name: str(getattr(schema.data_type, "value", schema.data_type))
+                    for name, schema in (info.payload_schema or {}).items()
+                }
+            except Exception as e:
+                print(f"⚠️ Could not read payload indexes for '{collection_name}': {e}")
+                return {}
+        return _indexed_fields_cache[collection_name]
+
+    def build_filter(self, collection_name: str, filter_spec: Dict[str, List[Dict[str, Any]]]) -> models.Filter:
+        """
+        Converts a filter spec ({"must": [...], "should": [...], "must_not": [...]}) into a Qdrant Filter.
+        Each condition is {"key": ..., "value": ...}, {"key": ..., "any": [...]} or {"key": ..., "range": {...}}.
+        Warns when a condition targets a field without a payload index (full scan in Qdrant).
+        """
+        clauses = {}
+        used_keys = set()
+        for clause in ("must", "should", "must_not"):
+            conditions = [self._build_condition(c) for c in filter_spec.get(clause) or []]
+            used_keys.update(c["key"] for c in filter_spec.get(clause) or [])
+            clauses[clause] = conditions or None
+
+        indexed = self.get_indexed_fields(collection_name)
+        unindexed = sorted(key for key in used_keys if key not in indexed)
+        if unindexed:
+            print(f"⚠️ Filtering '{collection_name}' on unindexed field(s) {unindexed}. "
+                  f"Declare them filterable to avoid full payload scans.")
+
+        return models.Filter(**clauses)
+
+    @staticmethod
+    def _build_condition(condition: Dict[str, Any]) -> models.FieldCondition:
+        key = condition["key"]
+        if condition.get("any") is not None:
+            return models.FieldCondition(key=key, match=models.MatchAny(any=condition["any"]))
+        if condition.get("range") is not None:
+            bounds = {k: v for k, v in condition["range"].items() if v is not None}
+            # String bounds are ISO-8601 timestamps (e.g. created_at), numbers are plain ranges (e.g. chunk_index)
+            if any(isinstance(v, str) for v in bounds.values()):
+                return models.FieldCondition(key=key, range=models.DatetimeRange(**bounds))
+            return models.FieldCondition(key=key, range=models.Range(**bounds))
+        if condition.get("value") is not None:
+            return models.FieldCondition(key=key, match=models.MatchValue(value=condition["value"]))
+        raise ValueError(f"Filter condition on '{key}' needs one of 'value', 'any' or 'range'")
 
-    def create_collection(self, collection_name: str, vector_size: int = 1024, distance_mode: str = "cosine"):
+    def create_collection(
+        self,
+        collection_name: str,
+        vector_size: int = 1024,
+        distance_mode: str = "cosine",
+        quantization: Optional[str] = None,
+        bulk_load: bool = False
+    ):
+        """
+        quantization: None, "scalar" (int8) or "binary".
+        bulk_load: disable HNSW indexing until finish_bulk_load() is called (faster mass upserts).
+        """
         distance_map = {
             "cosine": Distance.COSINE,
             "euclid": Distance.EUCLID,
@@ -52,7 +137,9 @@ class QdrantService:
                 vectors_config=VectorParams(     
                     size=vector_size, 
                     distance=selected_distance   
-                )
+                ),
+                quantization_config=QUANTIZATION_CONFIGS.get(quantization),
+                optimizers_config=models.OptimizersConfigDiff(indexing_threshold=0) if bulk_load else None
             )
             print(f"✅ Collection '{collection_name}' created successfully.")
             
@@ -68,17 +155,8 @@ class QdrantService:
         
         for i, vector in enumerate(vectors):
             payload = payloads[i]
-            # ===== Deterministic ID =====
-            if 'source' in payload and 'chunk_index' in payload:
-                unique_key = f"{payload['source']}_{payload['chunk_index']}"
-                point_id = generate_id(unique_key)
-            elif 'text' in payload:
-                point_id = generate_id(payload['text'])
-            else:
-                point_id = str(uuid.uuid4())
-
             points.append(PointStruct(
-                id=point_id,
+                id=generate_point_id(payload),
                 vector=vector,
                 payload=payload 
             ))
@@ -92,18 +170,106 @@ class QdrantService:
         except Exception as e:
             print(f"❌ Upsert Failed: {e}")
 
+    def upsert_points(self, collection_name: str, ids: List[Union[str, int]], vectors: List[List[float]], payloads: List[Dict[str, Any]]):
+        """
+        Upserts points with explicit IDs (e.g. when copying between collections). Raises on failure.
+        """
+        self.client.upsert(
+            collection_name=collection_name,
+            wait=True,
+            points=models.Batch(ids=ids, vectors=vectors, payloads=payloads)
+        )
+
+    def scroll_points(
+        self,
+        collection_name: str,
+        offset: Optional[Union[str, int]] = None,
+        limit: int = 256,
+        scroll_filter: Optional[models.Filter] = None
+    ):
+        """
+        Reads one page of points (payload only, no vectors). Returns (points, next_offset); next_offset is None at the end.
+        """
+        return self.client.scroll(
+            collection_name=collection_name,
+            scroll_filter=scroll_filter,
+            offset=offset,
+            limit=limit,
+            with_payload=True,
+            with_vectors=False
+        )
+
+    def get_payloads(self, collection_name: str, ids: List[Union[str, int]], fields: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Selected payload fields of the given points that exist in the collection, keyed by str(id).
+        """
+        points = self.client.retrieve(
+            collection_name=collection_name,
+            ids=ids,
+            with_payload=models.PayloadSelectorInclude(include=fields),
+            with_vectors=False
+        )
+        return {str(point.id): point.payload or {} for point in points}
+
+    def count_points(self, collection_name: str, count_filter: Optional[models.Filter] = None) -> int:
+        return self.client.count(collection_name=collection_name, count_filter=count_filter, exact=True).count
+
+    def finish_bulk_load(self, collection_name: str, indexing_threshold: int = 20000):
+        """
+        Re-enables HNSW indexing after a bulk load (see create_collection(bulk_load=True)).
+        """
+        self.client.update_collection(
+            collection_name=collection_name,
+            optimizers_config=models.OptimizersConfigDiff(indexing_threshold=indexing_threshold)
+        )
+
+    def resolve_alias(self, alias_name: str) -> Optional[str]:
+        """
+        Returns the collection an alias points to, or None if the alias does not exist.
+        """
+        for alias in self.client.get_aliases().aliases:
+            if alias.alias_name == alias_name:
+                return alias.collection_name
+        return None
+
+    def swap_alias(self, alias_name: str, collection_name: str):
+        """
+        Atomically (re)points an alias to a collection.
+        """
+        operations = []
+        if self.resolve_alias(alias_name) is not None:
+            operations.append(models.DeleteAliasOperation(delete_alias=models.DeleteAlias(alias_name=alias_name)))
+        operations.append(models.CreateAliasOperation(
+            create_alias=models.CreateAlias(collection_name=collection_name, alias_name=alias_name)
+        ))
+        self.client.update_collection_aliases(change_aliases_operations=operations)
+        print(f"🔀 Alias '{alias_name}' -> '{collection_name}'")
+
+    @staticmethod
+    def _payload_selector(with_payload: PayloadSelector):
+        """
+        Maps the backend-neutral projection to Qdrant's with_payload, so unneeded fields are never sent.
+        """
+        if isinstance(with_payload, dict):
+            if "include" in with_payload:
+                return models.PayloadSelectorInclude(include=with_payload["include"])
+            return models.PayloadSelectorExclude(exclude=with_payload.get("exclude", []))
+        return with_payload
+
     def search_similarity(
         self,
         collection_name: str, 
         query_vector: List[float], limit: int ,
-        score_threshold: float = 0.0
+        score_threshold: float = 0.0,
+        with_payload: PayloadSelector = True
         ):
         try:
             search_result = self.client.query_points(
                 collection_name=collection_name,
                 query=query_vector,       
                 limit=limit,
-                score_threshold=score_threshold
+                score_threshold=score_threshold,
+                with_payload=self._payload_selector(with_payload)
             )
             
             return search_result.points
@@ -116,31 +282,27 @@ class QdrantService:
         self,
         collection_name: str, 
         query_vector: List[float], 
-        key: str, 
-        value: Union[str, int], 
+        filter_spec: Dict[str, List[Dict[str, Any]]], 
         limit: int,
-        score_threshold:float = 0.0
+        score_threshold:float = 0.0,
+        with_payload: PayloadSelector = True
     ):
         """
-        Performs a semantic search with an exact match filter.
-        Example: Search for "curriculum" ONLY in file "manual.pdf"
+        Performs a semantic search restricted by a compound payload filter.
+        Example: Search for "curriculum" ONLY in "manual.pdf" chunks created this year
         """
         try:
             # 1. Create filter condition
-            filter_condition = models.Filter(
-                must=[
-                    models.FieldCondition(
-                        key=key, 
-                        match=models.MatchValue(value=value)
-                    )
-                ]
-            )
+            filter_condition = self.build_filter(collection_name, filter_spec)
+
+            # 2. Search
             search_result = self.client.query_points(
                 collection_name=collection_name,
                 query=query_vector,
                 query_filter=filter_condition,
                 limit=limit,
-                score_threshold=score_threshold
+                score_threshold=score_threshold,
+                with_payload=self._payload_selector(with_payload)
             )
             
             # 3. Return results
@@ -160,9 +322,22 @@ class QdrantService:
         try:
             # 1. Get all collection names
             response = self.client.get_collections()
+            # Reindexed collections are addressed by their alias: list the alias, hide the collection behind it
+            aliases = {alias.alias_name: alias.collection_name for alias in self.client.get_aliases().aliases}
             
             collections_info = []
+            for alias_name, collection_name in aliases.items():
+                info = self.client.get_collection(collection_name=collection_name)
+                collections_info.append({
+                    "name": alias_name,
+                    "points_count": info.points_count,
+                    "status": info.status,
+                    "alias_of": collection_name
+                })
+
             for collection in response.collections:
+                if collection.name in aliases.values():
+                    continue
                 # 2. Get detailed info for each collection
                 info = self.client.get_collection(collection_name=collection.name)
                 collections_info.append({
@@ -1,11 +1,15 @@
 import os
 import torch
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 # --- ⚠️ SYSTEM CONFIGURATION (MUST BE FIRST) ⚠️ ---
 # Must configure this before importing any Router or Model
-PHYSICAL_CORES = "8" 
+# Per-class thread budgets are applied by the ComputeScheduler executors (app/core/compute.py)
+from app.core.config import settings
+
+PHYSICAL_CORES = str(settings.COMPUTE_CORES)
 os.environ["OMP_NUM_THREADS"] = PHYSICAL_CORES
 os.environ["MKL_NUM_THREADS"] = PHYSICAL_CORES
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
@@ -13,13 +17,21 @@ os.environ["TOKENIZERS_PARALLELISM"] = "false"
 try:
     torch.set_num_threads(int(PHYSICAL_CORES))
     torch.set_num_interop_threads(1)
-    print(f"✅ System configured with {PHYSICAL_CORES} threads.")
+    print(f"✅ System configured with {PHYSICAL_CORES} threads "
+          f"(query: {settings.QUERY_WORKERS}x{settings.QUERY_THREADS}, ingest: {settings.INGEST_WORKERS}x{settings.INGEST_THREADS}).")
 except RuntimeError:
     pass
 # ---------------------------------------------------
 
 # Import Router after system config is done
 from app.api.routes import router as api_router
+from app.ai_services.llm_gateway import LLMGatewayError, CircuitOpenError
+
+# The embedded vector store is single-process: open (and lock) it at startup so an extra
+# uvicorn worker fails immediately instead of on its first request
+if settings.VECTOR_BACKEND == "local":
+    from app.api.deps import get_local_vector_store
+    get_local_vector_store()
 
 app = FastAPI(
     title="RAG SCB API",
@@ -39,6 +51,12 @@ app.add_middleware(
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
 
+# Map LLM gateway failures to 503 instead of returning them as answers
+@app.exception_handler(LLMGatewayError)
+async def llm_unavailable_handler(request: Request, exc: LLMGatewayError):
+    headers = {"Retry-After": str(int(exc.retry_after) + 1)} if isinstance(exc, CircuitOpenError) else None
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers=headers)
+
 @app.get("/")
 async def root():
     return {
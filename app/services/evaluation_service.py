@@ -0,0 +1,328 @@
+import asyncio
+import datetime
+import json
+import math
+import os
+import time
+from dataclasses import dataclass, asdict
+from typing import Optional, List, Dict, Any, Callable
+
+from app.core.config import settings
+from app.services.search_service import SearchService
+
+STAGES = ["embedding", "vector_search", "rerank", "total"]
+
+
+@dataclass
+class EvalConfig:
+    """
+    One retrieval configuration under test. Configs are loaded from JSON files with the same keys.
+    """
+    name: str
+    collection: str
+    model_name: str = settings.MODEL_NAME
+    vector_backend: str = settings.VECTOR_BACKEND
+    score_threshold: float = 0.0
+    filter: Optional[Dict[str, List[Dict[str, Any]]]] = None
+    rerank_model: Optional[str] = None
+    rerank_candidates: int = 50
+
+
+@dataclass
+class LabelledQuery:
+    query: str
+    # Each item identifies one relevant chunk: {"id": ...} or payload fields such as {"source": ..., "chunk_index": ...},
+    # plus an optional graded "grade" (default 1) used by nDCG
+    relevant: List[Dict[str, Any]]
+    filter: Optional[Dict[str, List[Dict[str, Any]]]] = None
+    id: Optional[str] = None
+
+
+def load_queries(path: str) -> List[LabelledQuery]:
+    """
+    Reads a JSONL query set. One object per line:
+        {"query": "...", "relevant": ["<point id>", {"source": "handbook.pdf", "chunk_index": 3, "grade": 2}], "filter": {...}}
+    """
+    queries = []
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if not item.get("query") or not item.get("relevant"):
+                raise ValueError(f"{path}:{line_no}: 'query' and a non-empty 'relevant' list are required")
+            queries.append(LabelledQuery(
+                query=item["query"],
+                relevant=[r if isinstance(r, dict) else {"id": r} for r in item["relevant"]],
+                filter=item.get("filter"),
+                id=str(item.get("id", line_no))
+            ))
+    return queries
+
+
+def load_config(path: str, collection: Optional[str] = None) -> EvalConfig:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    data.setdefault("name", os.path.splitext(os.path.basename(path))[0])
+    if collection and "collection" not in data:
+        data["collection"] = collection
+    return EvalConfig(**data)
+
+# ==========================================
+# 📏 Metrics
+# ==========================================
+
+def _normalize_id(value: Any) -> str:
+    # Qdrant returns UUIDs with dashes, generate_point_id produces them without
+    return str(value).replace("-", "").lower()
+
+def _is_match(point: Any, item: Dict[str, Any]) -> bool:
+    if "id" in item:
+        return _normalize_id(point.id) == _normalize_id(item["id"])
+    payload = point.payload or {}
+    return all(payload.get(key) == value for key, value in item.items() if key != "grade")
+
+def relevance_grades(results: List[Any], relevant: List[Dict[str, Any]]) -> List[int]:
+    """
+    Grade of each retrieved point in rank order (0 = not relevant). Each labelled item is credited once.
+    """
+    remaining = list(relevant)
+    grades = []
+    for point in results:
+        grade = 0
+        for i, item in enumerate(remaining):
+            if _is_match(point, item):
+                grade = item.get("grade", 1)
+                del remaining[i]
+                break
+        grades.append(grade)
+    return grades
+
+def recall_at_k(grades: List[int], num_relevant: int, k: int) -> float:
+    return sum(1 for grade in grades[:k] if grade > 0) / num_relevant
+
+def reciprocal_rank(grades: List[int]) -> float:
+    for rank, grade in enumerate(grades, 1):
+        if grade > 0:
+            return 1.0 / rank
+    return 0.0
+
+def ndcg_at_k(grades: List[int], relevant: List[Dict[str, Any]], k: int) -> float:
+    def dcg(values):
+        return sum((2 ** grade - 1) / math.log2(rank + 2) for rank, grade in enumerate(values[:k]))
+
+    ideal = dcg(sorted((item.get("grade", 1) for item in relevant), reverse=True))
+    return dcg(grades) / ideal if ideal else 0.0
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    """
+    Nearest-rank percentiles of latencies in milliseconds.
+    """
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def rank(p):
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))]
+
+    return {
+        "p50": round(rank(50), 3),
+        "p95": round(rank(95), 3),
+        "p99": round(rank(99), 3),
+        "mean": round(sum(ordered) / len(ordered), 3),
+        "max": round(ordered[-1], 3),
+    }
+
+def _merge_filters(*specs: Optional[Dict[str, List[Dict[str, Any]]]]) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+    merged = {"must": [], "should": [], "must_not": []}
+    for spec in specs:
+        for clause in merged:
+            merged[clause].extend((spec or {}).get(clause) or [])
+    return merged if any(merged.values()) else None
+
+# ==========================================
+# 🧪 Evaluation
+# ==========================================
+
+class EvaluationService:
+    """
+    Offline retrieval evaluation: runs a labelled query set through SearchService for one or more
+    configurations and reports recall@k, MRR and nDCG@k with per-stage latency percentiles.
+    With several configs every query runs against all of them (in alternating order, so neither
+    side always gets the warmer caches) and each config is compared to the first one.
+    """
+
+    def __init__(self, build_search_service: Callable[[EvalConfig], SearchService]):
+        self.build_search_service = build_search_service
+
+    async def _run_query(self, service: SearchService, config: EvalConfig, query: LabelledQuery, limit: int):
+        timings = {}
+        started = time.perf_counter()
+        results = await service.retrieve(
+            config.collection, query.query, limit, config.score_threshold,
+            filter_spec=_merge_filters(config.filter, query.filter),
+            timings=timings
+        )
+        timings["total"] = time.perf_counter() - started
+        return results, timings
+
+    async def evaluate(self, queries: List[LabelledQuery], configs: List[EvalConfig], ks: List[int], warmup: int = 3) -> Dict[str, Any]:
+        ks = sorted(set(ks))
+        limit = ks[-1]
+        services = {config.name: self.build_search_service(config) for config in configs}
+
+        # Warm-up: model / index / page-cache loading should not land in the percentiles
+        for query in queries[:warmup]:
+            for config in configs:
+                await self._run_query(services[config.name], config, query, limit)
+
+        per_query = {config.name: [] for config in configs}
+        for i, query in enumerate(queries):
+            order = configs if i % 2 == 0 else configs[::-1]
+            for config in order:
+                results, timings = await self._run_query(services[config.name], config, query, limit)
+                grades = relevance_grades(results, query.relevant)
+                record = {
+                    "id": query.id,
+                    "query": query.query,
+                    "retrieved": [str(point.id) for point in results],
+                    "grades": grades,
+                    "mrr": reciprocal_rank(grades),
+                    "latency_ms": {stage: round(seconds * 1000, 3) for stage, seconds in timings.items()},
+                }
+                for k in ks:
+                    record[f"recall@{k}"] = recall_at_k(grades, len(query.relevant), k)
+                    record[f"ndcg@{k}"] = ndcg_at_k(grades, query.relevant, k)
+                per_query[config.name].append(record)
+            print(f"🧪 [{i + 1}/{len(queries)}] {query.query[:60]}")
+
+        metric_names = [f"{metric}@{k}" for metric in ("recall", "ndcg") for k in ks] + ["mrr"]
+        results = {}
+        for config in configs:
+            records = per_query[config.name]
+            results[config.name] = {
+                "metrics": {name: round(sum(r[name] for r in records) / len(records), 4) for name in metric_names},
+                "latency_ms": {stage: percentiles([r["latency_ms"][stage] for r in records]) for stage in STAGES},
+                "per_query": records,
+            }
+
+        report = {
+            "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "num_queries": len(queries),
+            "k": ks,
+            "mrr_cutoff": limit,
+            "configs": {config.name: asdict(config) for config in configs},
+            "results": results,
+        }
+        if len(configs) > 1:
+            report["comparisons"] = [self._compare(results, configs[0].name, config.name, f"ndcg@{limit}") for config in configs[1:]]
+        return report
+
+    @staticmethod
+    def _compare(results: Dict[str, Any], baseline: str, candidate: str, key_metric: str) -> Dict[str, Any]:
+        """
+        Candidate minus baseline: metric deltas, latency percentile deltas and per-query wins / losses on `key_metric`.
+        """
+        base, cand = results[baseline], results[candidate]
+        wins = losses = 0
+        for b, c in zip(base["per_query"], cand["per_query"]):
+            if c[key_metric] > b[key_metric] + 1e-9:
+                wins += 1
+            elif c[key_metric] < b[key_metric] - 1e-9:
+                losses += 1
+        return {
+            "baseline": baseline,
+            "candidate": candidate,
+            "metric_deltas": {name: round(cand["metrics"][name] - value, 4) for name, value in base["metrics"].items()},
+            "latency_deltas_ms": {
+                stage: {p: round(cand["latency_ms"][stage][p] - value, 3) for p, value in base["latency_ms"][stage].items()}
+                for stage in STAGES
+            },
+            "per_query": {"metric": key_metric, "wins": wins, "losses": losses, "ties": len(base["per_query"]) - wins - losses},
+        }
+
+    def write_report(self, report: Dict[str, Any], path: Optional[str] = None) -> str:
+        if path is None:
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            path = os.path.join(settings.EVAL_REPORT_DIR, f"eval_{timestamp}.json")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        return path
+
+
+def print_summary(report: Dict[str, Any]):
+    names = list(report["results"])
+    metrics = list(report["results"][names[0]]["metrics"])
+    print(f"\n{'':<22}" + "".join(f"{name[:16]:>18}" for name in names))
+    for metric in metrics:
+        print(f"{metric:<22}" + "".join(f"{report['results'][name]['metrics'][metric]:>18.4f}" for name in names))
+    for stage in STAGES:
+        for p in ("p50", "p95"):
+            label = f"{stage} {p} ms"
+            print(f"{label:<22}" + "".join(f"{report['results'][name]['latency_ms'][stage][p]:>18.2f}" for name in names))
+    for comparison in report.get("comparisons", []):
+        per_query = comparison["per_query"]
+        print(f"\n📊 {comparison['candidate']} vs {comparison['baseline']} on {per_query['metric']}: "
+              f"{per_query['wins']} wins / {per_query['losses']} losses / {per_query['ties']} ties")
+
+
+def main():
+    """
+    CLI: python -m app.services.evaluation_service queries.jsonl --config a.json [--config b.json] [--k 1 3 5 10]
+    Fully offline with QDRANT_PATH (Qdrant local mode) or VECTOR_BACKEND=local, a local MODEL_NAME
+    directory and HF_HUB_OFFLINE=1.
+    """
+    import argparse
+    from functools import lru_cache
+    from sentence_transformers import SentenceTransformer, CrossEncoder
+    from app.api.deps import get_qdrant_client, get_local_vector_store, get_compute_scheduler
+    from app.ai_services.embeding_service import BGEEmbedding
+    from app.ai_services.rerank_service import CrossEncoderReranker
+    from app.db.qdrant_service import QdrantService
+
+    parser = argparse.ArgumentParser(description="Evaluate retrieval quality and latency on a labelled query set")
+    parser.add_argument("queries", help="JSONL file of labelled queries")
+    parser.add_argument("--config", action="append", default=[], help="JSON config file; repeat to A/B (first one is the baseline)")
+    parser.add_argument("--collection", help="collection for configs that do not set one")
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3, 5, 10])
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--output", help=f"report path (default: {settings.EVAL_REPORT_DIR}/eval_<timestamp>.json)")
+    args = parser.parse_args()
+
+    if args.config:
+        configs = [load_config(path, args.collection) for path in args.config]
+    elif args.collection:
+        configs = [EvalConfig(name="default", collection=args.collection)]
+    else:
+        parser.error("pass --config and/or --collection")
+    if len({config.name for config in configs}) != len(configs):
+        parser.error("config names must be unique")
+
+    # Models are loaded once per name and shared between configs
+    @lru_cache()
+    def embedder(model_name: str) -> BGEEmbedding:
+        print(f"🧠 Loading AI Model: {model_name} ...")
+        return BGEEmbedding(model=SentenceTransformer(model_name))
+
+    @lru_cache()
+    def reranker(model_name: str) -> CrossEncoderReranker:
+        print(f"🧠 Loading Reranker: {model_name} ...")
+        return CrossEncoderReranker(CrossEncoder(model_name))
+
+    def build_search_service(config: EvalConfig) -> SearchService:
+        store = get_local_vector_store() if config.vector_backend == "local" else QdrantService(get_qdrant_client())
+        return SearchService(
+            embedder(config.model_name), None, store, get_compute_scheduler(),
+            reranker(config.rerank_model) if config.rerank_model else None, config.rerank_candidates
+        )
+
+    service = EvaluationService(build_search_service)
+    report = asyncio.run(service.evaluate(load_queries(args.queries), configs, args.k, args.warmup))
+    report["queries_file"] = args.queries
+    print_summary(report)
+    print(f"\n✅ Report written to {service.write_report(report, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,30 @@
 import os
 import shutil
 import tempfile
+import numpy as np
 from fastapi import UploadFile, HTTPException
-from app.db.qdrant_service import QdrantService
+from app.db.base import VectorStore
 from app.ai_services.ocr_service import DoclingParser
 from app.ai_services.embeding_service import BGEEmbedding
 from app.utils.helpers import text_splitter, build_payload
+from app.core.compute import ComputeScheduler, INGEST
+
+# Chunks embedded per batch; ingestion yields to pending search queries between batches
+EMBED_BATCH_CHUNKS = 32
 
 class IngestionService:
-    def __init__(self, parser: DoclingParser, embedder: BGEEmbedding, qdrant: QdrantService):
+    def __init__(self, parser: DoclingParser, embedder: BGEEmbedding, store: VectorStore, scheduler: ComputeScheduler):
         self.parser = parser
         self.embedder = embedder
-        self.qdrant = qdrant
+        self.store = store
+        self.scheduler = scheduler
+
+    def _embed_chunks(self, chunks):
+        batches = []
+        for start in range(0, len(chunks), EMBED_BATCH_CHUNKS):
+            self.scheduler.yield_to_interactive()
+            batches.append(self.embedder.get_embeddings(chunks[start:start + EMBED_BATCH_CHUNKS]))
+        return np.concatenate(batches) if batches else np.empty((0, 0), dtype=np.float32)
 
     async def process_document(self, file: UploadFile, collection_name: str, doc_type: str):
         import json
@@ -24,7 +37,7 @@ class IngestionService:
         try:
             # 2. Parse document
             yield json.dumps({"status": "progress", "step": "parsing", "message": "Running Docling OCR & Layout Analysis..."}) + "\n"
-            markdown_text = self.parser.process_document(tmp_path)
+            markdown_text = await self.scheduler.run(INGEST, self.parser.process_document, tmp_path)
             if not markdown_text:
                 raise Exception("Failed to parse document")
 
@@ -34,7 +47,7 @@ class IngestionService:
             
             # 4. Embed chunks
             yield json.dumps({"status": "progress", "step": "embedding", "message": f"Embedding {len(chunks)} chunks..."}) + "\n"
-            embeddings = self.embedder.get_embeddings(chunks)
+            embeddings = await self.scheduler.run(INGEST, self._embed_chunks, chunks)
 
             # 5. Build payloads
             yield json.dumps({"status": "progress", "step": "preparing", "message": "Preparing vector payloads..."}) + "\n"
@@ -47,9 +60,9 @@ class IngestionService:
                     doc_type=doc_type
                 ))
 
-            # 6. Upsert to Qdrant
+            # 6. Upsert to vector store
             yield json.dumps({"status": "progress", "step": "upserting", "message": "Upserting to Vector Database..."}) + "\n"
-            self.qdrant.upsert_data(
+            self.store.upsert_data(
                 collection_name=collection_name,
                 vectors=embeddings.tolist(),
                 payloads=payloads
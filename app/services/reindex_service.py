@@ -0,0 +1,281 @@
+import datetime
+import json
+import os
+import time
+from typing import Optional, Dict, Any, Iterator, List
+
+from qdrant_client import models
+
+from app.core.config import settings
+from app.db.qdrant_service import QdrantService
+from app.core.compute import ComputeScheduler, INGEST
+
+
+class ReindexService:
+    """
+    Zero-downtime migration of a collection to a new embedding model / vector config.
+
+    Searches and uploads address the collection by its logical name (`alias`). The job:
+    1. copy:     scrolls the current collection page by page, re-embeds the stored `text`
+                 payloads and bulk-loads them into a new collection with the target config;
+    2. catch-up: copies points written to the old collection while the copy was running;
+    3. swap:     atomically repoints the alias to the new collection;
+    4. final catch-up for writes that raced the swap.
+    A plain collection named `alias` (first reindex) cannot coexist with the alias: its final
+    catch-up runs before the swap, then it is deleted and the alias created ("swapping" phase).
+
+    Progress is checkpointed after every page, so a crashed job resumes where it stopped.
+    """
+
+    def __init__(self, embedder, qdrant: QdrantService, scheduler: Optional[ComputeScheduler] = None):
+        self.embedder = embedder
+        self.qdrant = qdrant
+        self.scheduler = scheduler
+
+    # --- Checkpoint ---
+
+    def _state_path(self, alias: str) -> str:
+        return os.path.join(settings.REINDEX_STATE_DIR, f"{alias}.json")
+
+    def load_state(self, alias: str) -> Optional[Dict[str, Any]]:
+        path = self._state_path(alias)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_state(self, state: Dict[str, Any]):
+        os.makedirs(settings.REINDEX_STATE_DIR, exist_ok=True)
+        path = self._state_path(state["alias"])
+        # Write then rename so a crash never leaves a half-written checkpoint
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(path + ".tmp", path)
+
+    # --- Job ---
+
+    def reindex(
+        self,
+        alias: str,
+        distance_mode: str = "cosine",
+        quantization: Optional[str] = None,
+        batch_size: int = 256,
+        max_points_per_second: Optional[float] = None,
+        drop_source: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Runs (or resumes) the reindex of `alias` and yields progress events.
+        """
+        state = self.load_state(alias)
+        if state and state["phase"] != "done":
+            yield {"status": "progress", "step": "resuming", "message": f"Resuming '{state['target']}' at phase '{state['phase']}'"}
+        else:
+            source = self.qdrant.resolve_alias(alias) or alias
+            if not self.qdrant.client.collection_exists(source):
+                yield {"status": "error", "message": f"Collection '{alias}' not found"}
+                return
+            if source == alias and not drop_source:
+                # A collection and an alias cannot share a name, so the first migration has to replace it
+                yield {"status": "error", "message": f"'{alias}' is a collection, not an alias yet: the first reindex "
+                                                     f"replaces it with an alias to the new collection and deletes it. "
+                                                     f"Re-run with drop_source=true to confirm."}
+                return
+
+            vector_size = len(self.embedder.get_embeddings(["dimension probe"])[0])
+            target = f"{alias}_{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}"
+            suffix = 1
+            while self.qdrant.client.collection_exists(target):
+                suffix += 1
+                target = f"{alias}_{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}_{suffix}"
+            self.qdrant.create_collection(
+                collection_name=target,
+                vector_size=vector_size,
+                distance_mode=distance_mode,
+                quantization=quantization,
+                bulk_load=True
+            )
+            if not self.qdrant.client.collection_exists(target):
+                yield {"status": "error", "message": f"Failed to create collection '{target}'"}
+                return
+
+            state = {
+                "alias": alias,
+                "source": source,
+                "target": target,
+                "phase": "copy",
+                "offset": None,
+                "processed": 0,
+                "started_at": datetime.datetime.now().isoformat(),
+                "catchup_since": None,
+                "final_since": None,
+                "skipped_without_text": 0,
+                "skipped_up_to_date": 0,
+            }
+            self._save_state(state)
+            yield {"status": "progress", "step": "created", "message": f"Copying '{source}' into '{target}' ({vector_size}d)"}
+
+        try:
+            if state["phase"] == "copy":
+                yield from self._copy(state, None, batch_size, max_points_per_second)
+                # The final pass must cover everything written once the catch-up scroll has started
+                state.update(phase="catchup", offset=None, processed=0,
+                             catchup_since=state["started_at"], final_since=datetime.datetime.now().isoformat())
+                self._save_state(state)
+
+            if state["phase"] == "catchup":
+                yield from self._copy(state, state["catchup_since"], batch_size, max_points_per_second)
+                self.qdrant.finish_bulk_load(state["target"])
+                if state["source"] == alias:
+                    # First migration of a pre-alias collection: it must be deleted before the alias can be created
+                    state.update(phase="swapping", offset=None, processed=0)
+                    self._save_state(state)
+                else:
+                    self.qdrant.swap_alias(alias, state["target"])
+                    state.update(phase="final_catchup", offset=None, processed=0)
+                    self._save_state(state)
+                    yield {"status": "progress", "step": "swapped", "message": f"Alias '{alias}' now points to '{state['target']}'"}
+
+            if state["phase"] == "swapping":
+                yield from self._replace_with_alias(state, batch_size, max_points_per_second)
+                state.update(phase="done", offset=None)
+                self._save_state(state)
+                yield {"status": "progress", "step": "swapped", "message": f"Alias '{alias}' now points to '{state['target']}'"}
+
+            if state["phase"] == "final_catchup":
+                yield from self._copy(state, state["final_since"], batch_size, max_points_per_second)
+                if drop_source:
+                    self.qdrant.client.delete_collection(state["source"])
+                state.update(phase="done", offset=None)
+                self._save_state(state)
+
+        except Exception as e:
+            yield {"status": "error", "message": f"{e} (re-run to resume from the last checkpoint)"}
+            return
+
+        yield {
+            "status": "success",
+            "alias": alias,
+            "collection": state["target"],
+            "previous_collection": None if drop_source or state["source"] == alias else state["source"],
+            "points_count": self.qdrant.count_points(state["target"]),
+            "skipped_without_text": state.get("skipped_without_text", 0),
+            "message": f"Keep using '{alias}' for uploads and searches: it now points to '{state['target']}'"
+        }
+
+    def _copy(self, state: Dict[str, Any], since: Optional[str], batch_size: int, max_points_per_second: Optional[float]):
+        """
+        Scroll -> re-embed -> upsert, page by page from the checkpointed offset.
+        `since` restricts the copy to points created/updated after that timestamp (catch-up passes);
+        those passes skip points whose target copy is at least as recent, so a late write to the old
+        collection never overwrites a newer point written through the alias after the swap.
+        Points without `text` cannot be re-embedded: they are counted and reported, not copied.
+        """
+        scroll_filter = None
+        if since is not None:
+            scroll_filter = models.Filter(must=[
+                models.FieldCondition(key="created_at", range=models.DatetimeRange(gte=since))
+            ])
+        total = self.qdrant.count_points(state["source"], scroll_filter)
+        step = state["phase"]
+
+        while True:
+            page_started = time.monotonic()
+            points, next_offset = self.qdrant.scroll_points(
+                state["source"], offset=state["offset"], limit=batch_size, scroll_filter=scroll_filter
+            )
+            without_text = [p for p in points if not (p.payload or {}).get("text")]
+            points = [p for p in points if (p.payload or {}).get("text")]
+            if since is not None and points:
+                current = len(points)
+                points = self._newer_than_target(state["target"], points)
+                state["skipped_up_to_date"] = state.get("skipped_up_to_date", 0) + current - len(points)
+            state["skipped_without_text"] = state.get("skipped_without_text", 0) + len(without_text)
+            if points:
+                texts = [p.payload["text"] for p in points]
+                if self.scheduler is not None:
+                    # Background work: let pending search queries go first, then embed on the ingest executor's thread budget
+                    self.scheduler.yield_to_interactive()
+                    vectors = self.scheduler.run_sync(INGEST, self.embedder.get_embeddings, texts, batch_size=32)
+                else:
+                    vectors = self.embedder.get_embeddings(texts, batch_size=32)
+                self.qdrant.upsert_points(
+                    state["target"],
+                    ids=[p.id for p in points],
+                    vectors=vectors.tolist(),
+                    payloads=[p.payload for p in points]
+                )
+
+            state["offset"] = next_offset
+            state["processed"] += len(points)
+            self._save_state(state)
+            yield {"status": "progress", "step": step, "processed": state["processed"], "total": total,
+                   "skipped_without_text": state["skipped_without_text"], "skipped_up_to_date": state["skipped_up_to_date"]}
+
+            if next_offset is None:
+                return
+
+            # Throttle so the job does not starve live search / ingestion
+            if max_points_per_second:
+                min_duration = len(points) / max_points_per_second
+                elapsed = time.monotonic() - page_started
+                if elapsed < min_duration:
+                    time.sleep(min_duration - elapsed)
+
+    def _newer_than_target(self, target: str, points: List[Any]) -> List[Any]:
+        """
+        Drops points whose copy in `target` has a `created_at` at least as recent as the source's.
+        """
+        existing = self.qdrant.get_payloads(target, [p.id for p in points], ["created_at"])
+
+        def is_newer(point) -> bool:
+            target_payload = existing.get(str(point.id))
+            if target_payload is None:
+                return True
+            try:
+                return (datetime.datetime.fromisoformat(point.payload["created_at"])
+                        > datetime.datetime.fromisoformat(target_payload["created_at"]))
+            except (KeyError, TypeError, ValueError):
+                return True
+
+        return [p for p in points if is_newer(p)]
+
+    def _replace_with_alias(self, state: Dict[str, Any], batch_size: int, max_points_per_second: Optional[float]):
+        """
+        Swap for a pre-alias collection: final catch-up from it, delete it, create the alias.
+        Each step is safe to repeat, so a crash anywhere in this phase resumes here.
+        """
+        alias = state["alias"]
+        if self.qdrant.resolve_alias(alias) == state["target"]:
+            return  # Swapped before the crash, only the checkpoint was missing
+
+        if self.qdrant.resolve_alias(alias) is None and self.qdrant.client.collection_exists(alias):
+            # Writes since the catch-up scroll started; the remaining gap is the delete + alias call below
+            yield from self._copy(state, state["final_since"], batch_size, max_points_per_second)
+            self.qdrant.client.delete_collection(alias)
+        self.qdrant.swap_alias(alias, state["target"])
+
+def main():
+    """
+    CLI: python -m app.services.reindex_service <alias> [--quantization scalar] [--batch-size 256] [--rate 500]
+    Re-run the same command to resume after a crash.
+    """
+    import argparse
+    from app.api.deps import get_qdrant_client, get_embedder, get_compute_scheduler
+
+    parser = argparse.ArgumentParser(description="Re-embed a collection into a new one and swap the alias")
+    parser.add_argument("alias")
+    parser.add_argument("--distance", default="cosine")
+    parser.add_argument("--quantization", choices=["scalar", "binary"])
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--rate", type=float, help="max points per second")
+    parser.add_argument("--drop-source", action="store_true")
+    args = parser.parse_args()
+
+    # Scheduler: embedding runs on the ingest executor (and as ingest priority on a shared embedding server)
+    service = ReindexService(get_embedder(), QdrantService(get_qdrant_client()), get_compute_scheduler())
+    for event in service.reindex(args.alias, args.distance, args.quantization, args.batch_size, args.rate, args.drop_source):
+        print(json.dumps(event, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,48 +1,132 @@
-from typing import Optional, List, Any
-from app.db.qdrant_service import QdrantService
+import time
+from typing import Optional, List, Any, Dict
+from app.db.base import VectorStore, PayloadSelector
 from app.ai_services.embeding_service import BGEEmbedding
 from app.ai_services.llm_service import TyphoonRAGService
+from app.ai_services.rerank_service import CrossEncoderReranker
+from app.core.compute import ComputeScheduler, QUERY
+from app.api.schemas.models import SearchHit, SearchResponse
+from app.utils.helpers import make_snippet, query_pattern
+
+# Payload fields the answer context is built from (see app/utils/context_builder.py)
+CONTEXT_FIELDS = ["text", "source", "chunk_index"]
 
 class SearchService:
-    def __init__(self, embedder: BGEEmbedding, llm: TyphoonRAGService, qdrant: QdrantService):
+    def __init__(self, embedder: BGEEmbedding, llm: TyphoonRAGService, store: VectorStore, scheduler: ComputeScheduler,
+                 reranker: Optional[CrossEncoderReranker] = None, rerank_candidates: int = 50):
         self.embedder = embedder
         self.llm = llm
-        self.qdrant = qdrant
-
-    async def search(self, collection_name: str, query: str, limit: int, score_threshold: float, ask_ai: bool):
-        query_vector = self.embedder.get_embeddings([query])[0].tolist()
-        
-        results = self.qdrant.search_similarity(
-            collection_name=collection_name,
-            query_vector=query_vector,
-            limit=limit,
-            score_threshold=score_threshold
-        )
-        
+        self.store = store
+        self.scheduler = scheduler
+        # Optional second stage: the reranker re-scores `rerank_candidates` vector hits down to `limit`
+        self.reranker = reranker
+        self.rerank_candidates = rerank_candidates
+
+    async def _embed_query(self, query: str) -> List[float]:
+        # Interactive class: own executor and thread budget, ingestion yields to it
+        vectors = await self.scheduler.run(QUERY, self.embedder.get_embeddings, [query])
+        return vectors[0].tolist()
+
+    def _store_selector(self, include_fields: Optional[List[str]], exclude_fields: Optional[List[str]], snippet: bool, ask_ai: bool) -> PayloadSelector:
+        """
+        Payload fields to fetch from the store: what the response needs plus what snippets / the reranker / the answer need.
+        """
+        needed = (["text"] if snippet or self.reranker else []) + (CONTEXT_FIELDS if ask_ai else [])
+        if include_fields is not None:
+            return {"include": list(dict.fromkeys(include_fields + needed))}
+        if exclude_fields:
+            return {"exclude": [field for field in exclude_fields if field not in needed]}
+        return True
+
+    @staticmethod
+    def _project(payload: Optional[Dict[str, Any]], include_fields: Optional[List[str]], exclude_fields: Optional[List[str]], snippet: bool):
+        if payload is None:
+            return None
+        if include_fields is not None:
+            return {key: payload[key] for key in include_fields if key in payload}
+        # Snippet mode replaces the full chunk text unless it was explicitly requested
+        excluded = set(exclude_fields or []) | ({"text"} if snippet else set())
+        return {key: value for key, value in payload.items() if key not in excluded}
+
+    async def _respond(self, query: str, results: List[Any], ask_ai: bool, include_fields: Optional[List[str]],
+                       exclude_fields: Optional[List[str]], snippet: bool, snippet_length: int) -> SearchResponse:
         answer = None
         if ask_ai:
-            answer = self.llm.generate_answer(query, results)
-        
-        return {"results": results, "answer": answer}
-
-    async def search_filter(self, collection_name: str, query: str, filter_key: str, filter_value: str, limit: int, ask_ai: bool
-                            ,score_threshold: float):
-        query_vector = self.embedder.get_embeddings([query])[0].tolist()
-        
-        results = self.qdrant.search_with_filter(
-            collection_name=collection_name,
-            query_vector=query_vector,
-            key=filter_key,
-            value=filter_value,
-            limit=limit,
-            score_threshold=score_threshold
+            answer = await self.llm.generate_answer(query, results)
+
+        pattern = query_pattern(query) if snippet else None
+        hits = []
+        for point in results:
+            snippet_text, highlights = None, None
+            if snippet:
+                snippet_text, highlights = make_snippet((point.payload or {}).get("text", ""), pattern, snippet_length)
+            # model_construct: values come from the store, skip re-validation on the hot path
+            hits.append(SearchHit.model_construct(
+                id=point.id,
+                score=point.score,
+                payload=self._project(point.payload, include_fields, exclude_fields, snippet),
+                snippet=snippet_text,
+                highlights=highlights
+            ))
+        return SearchResponse.model_construct(results=hits, answer=answer)
+
+    async def retrieve(self, collection_name: str, query: str, limit: int, score_threshold: float = 0.0,
+                       filter_spec: Optional[Dict[str, List[Dict[str, Any]]]] = None, with_payload: PayloadSelector = True,
+                       timings: Optional[Dict[str, float]] = None) -> List[Any]:
+        """
+        Embeds the query, runs the vector search (filtered when `filter_spec` is given) and reranks if configured.
+        Stage durations in seconds ("embedding", "vector_search", "rerank") are stored in `timings` when given.
+        """
+        started = time.perf_counter()
+        query_vector = await self._embed_query(query)
+        embedded = time.perf_counter()
+
+        candidates = max(limit, self.rerank_candidates) if self.reranker else limit
+        if filter_spec:
+            results = self.store.search_with_filter(
+                collection_name=collection_name,
+                query_vector=query_vector,
+                filter_spec=filter_spec,
+                limit=candidates,
+                score_threshold=score_threshold,
+                with_payload=with_payload
+            )
+        else:
+            results = self.store.search_similarity(
+                collection_name=collection_name,
+                query_vector=query_vector,
+                limit=candidates,
+                score_threshold=score_threshold,
+                with_payload=with_payload
+            )
+        searched = time.perf_counter()
+
+        if self.reranker:
+            results = await self.scheduler.run(QUERY, self.reranker.rerank, query, results, limit)
+
+        if timings is not None:
+            timings["embedding"] = embedded - started
+            timings["vector_search"] = searched - embedded
+            timings["rerank"] = time.perf_counter() - searched if self.reranker else 0.0
+        return results
+
+    async def search(self, collection_name: str, query: str, limit: int, score_threshold: float, ask_ai: bool,
+                     include_fields: Optional[List[str]] = None, exclude_fields: Optional[List[str]] = None,
+                     snippet: bool = False, snippet_length: int = 200) -> SearchResponse:
+        results = await self.retrieve(
+            collection_name, query, limit, score_threshold,
+            with_payload=self._store_selector(include_fields, exclude_fields, snippet, ask_ai)
         )
-        
-        answer = None
-        if ask_ai:
-            answer = self.llm.generate_answer(query, results)
-            
-        return {"results": results, "answer": answer}
+        return await self._respond(query, results, ask_ai, include_fields, exclude_fields, snippet, snippet_length)
+
+    async def search_filter(self, collection_name: str, query: str, filter_spec: Dict[str, List[Dict[str, Any]]], limit: int, ask_ai: bool
+                            ,score_threshold: float, include_fields: Optional[List[str]] = None,
+                            exclude_fields: Optional[List[str]] = None, snippet: bool = False, snippet_length: int = 200) -> SearchResponse:
+        results = await self.retrieve(
+            collection_name, query, limit, score_threshold, filter_spec=filter_spec,
+            with_payload=self._store_selector(include_fields, exclude_fields, snippet, ask_ai)
+        )
+        return await self._respond(query, results, ask_ai, include_fields, exclude_fields, snippet, snippet_length)
 
     async def get_filters(self, collection_name: str):
-        return self.qdrant.get_available_filters(collection_name)
\ No newline at end of file
+        return self.store.get_available_filters(collection_name)
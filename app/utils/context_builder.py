@@ -0,0 +1,154 @@
+from dataclasses import dataclass, field
+from typing import List, Any, Optional
+
+from app.utils.helpers import CHUNK_OVERLAP
+
+# ==========================================
+# 📦 Context Builder Configuration
+# ==========================================
+# Rough chars-per-token ratio used to estimate prompt size without loading a tokenizer.
+# Thai text tokenizes denser than English, so this errs on the conservative side.
+CHARS_PER_TOKEN = 3.0
+# Blocks whose character shingles overlap at least this much are treated as duplicates
+DEDUP_THRESHOLD = 0.85
+SHINGLE_SIZE = 5
+# Shorter suffix/prefix matches are coincidences (e.g. a table row ending and the next starting with "|"), not splitter overlap
+MIN_CHUNK_OVERLAP = 20
+CONTEXT_SEPARATOR = "\n\n---\n\n"
+
+
+@dataclass
+class ContextBlock:
+    source: str
+    text: str
+    score: float
+    chunk_start: Optional[int] = None
+    chunk_end: Optional[int] = None
+    # Chunks a merged run was built from (with their own scores), so the packer can fall back to them
+    parts: List["ContextBlock"] = field(default_factory=list)
+
+
+def estimate_tokens(text: str) -> int:
+    return int(len(text) / CHARS_PER_TOKEN) + 1
+
+
+def _overlap_length(left: str, right: str, max_overlap: int = CHUNK_OVERLAP) -> int:
+    """
+    Length of the longest suffix of `left` that is also a prefix of `right`.
+    Consecutive chunks from the text splitter share at most CHUNK_OVERLAP characters;
+    matches shorter than MIN_CHUNK_OVERLAP count as no overlap.
+    """
+    for size in range(min(len(left), len(right), max_overlap), MIN_CHUNK_OVERLAP - 1, -1):
+        if left.endswith(right[:size]):
+            return size
+    return 0
+
+
+def merge_adjacent_chunks(search_results: List[Any]) -> List[ContextBlock]:
+    """
+    Groups hits by source and merges consecutive chunk_index runs into one block,
+    removing the text shared by neighbouring chunks. A block keeps the best score of its chunks.
+    """
+    by_source = {}
+    blocks = []
+    for hit in search_results:
+        payload = hit.payload or {}
+        source = payload.get("source", "Unknown")
+        if isinstance(payload.get("chunk_index"), int):
+            by_source.setdefault(source, {}).setdefault(payload["chunk_index"], hit)
+        else:
+            blocks.append(ContextBlock(source=source, text=payload.get("text", ""), score=hit.score))
+
+    for source, chunks in by_source.items():
+        current = None
+        for index in sorted(chunks):
+            hit = chunks[index]
+            text = hit.payload.get("text", "")
+            part = ContextBlock(source=source, text=text, score=hit.score, chunk_start=index, chunk_end=index)
+            if current is not None and index == current.chunk_end + 1:
+                overlap = _overlap_length(current.text, text)
+                current.text += text[overlap:] if overlap else "\n\n" + text
+                current.score = max(current.score, hit.score)
+                current.chunk_end = index
+                current.parts.append(part)
+            else:
+                current = ContextBlock(source=source, text=text, score=hit.score, chunk_start=index, chunk_end=index, parts=[part])
+                blocks.append(current)
+
+    return blocks
+
+
+def _shingles(text: str) -> set:
+    normalized = " ".join(text.split()).lower()
+    if len(normalized) <= SHINGLE_SIZE:
+        return {normalized}
+    return {normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1)}
+
+
+def drop_near_duplicates(blocks: List[ContextBlock], threshold: float = DEDUP_THRESHOLD) -> List[ContextBlock]:
+    """
+    Removes blocks that are (almost) contained in another block, e.g. the same paragraph
+    ingested from two files. The longer block survives and inherits the higher score.
+    """
+    kept = []
+    kept_shingles = []
+    for block in sorted(blocks, key=lambda b: len(b.text), reverse=True):
+        shingles = _shingles(block.text)
+        duplicate_of = None
+        for i, other in enumerate(kept_shingles):
+            if shingles and len(shingles & other) / len(shingles) >= threshold:
+                duplicate_of = i
+                break
+        if duplicate_of is None:
+            kept.append(block)
+            kept_shingles.append(shingles)
+        else:
+            kept[duplicate_of].score = max(kept[duplicate_of].score, block.score)
+    return kept
+
+
+def _format_block(block: ContextBlock) -> str:
+    return f"Content (from {block.source}):\n{block.text}"
+
+
+def pack_blocks(blocks: List[ContextBlock], token_budget: int) -> List[ContextBlock]:
+    """
+    Greedily packs blocks by score under the token budget. A merged run that does not fit is
+    split back into its chunks, which compete by their own scores, so the chunk that earned the
+    run its score is not lost. Other blocks that do not fit are skipped so smaller, lower-scored
+    blocks can still use the remaining space; the top chunk is truncated rather than dropped so
+    the best evidence always reaches the LLM.
+    """
+    packed = []
+    remaining = token_budget
+    separator_tokens = estimate_tokens(CONTEXT_SEPARATOR)
+    queue = sorted(blocks, key=lambda b: b.score, reverse=True)
+    while queue:
+        block = queue.pop(0)
+        cost = estimate_tokens(_format_block(block)) + (separator_tokens if packed else 0)
+        if cost <= remaining:
+            packed.append(block)
+            remaining -= cost
+        elif len(block.parts) > 1:
+            queue = sorted(queue + block.parts, key=lambda b: b.score, reverse=True)
+            continue
+        elif not packed:
+            header_tokens = estimate_tokens(f"Content (from {block.source}):\n")
+            max_chars = max(int((remaining - header_tokens) * CHARS_PER_TOKEN), 0)
+            block.text = block.text[:max_chars]
+            packed.append(block)
+            remaining = 0
+        if remaining <= separator_tokens:
+            break
+    return packed
+
+
+def build_context(search_results: List[Any], token_budget: int) -> str:
+    """
+    Builds the LLM context from search hits: merge adjacent chunks, drop near-duplicates,
+    then pack by score under `token_budget` (estimated tokens).
+    """
+    blocks = merge_adjacent_chunks(search_results)
+    blocks = drop_near_duplicates(blocks)
+    blocks = pack_blocks(blocks, token_budget)
+    return CONTEXT_SEPARATOR.join(_format_block(block) for block in blocks)
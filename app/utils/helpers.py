@@ -1,9 +1,16 @@
+import bisect
 import hashlib
+import itertools
 import re
 import os
+import uuid
 import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Tuple, Pattern
 from langchain_text_splitters import RecursiveCharacterTextSplitter
+try:
+    from pythainlp.tokenize import word_tokenize
+except ImportError:
+    word_tokenize = None
 # ==========================================
 # 📚 Text Splitter Configuration
 CHUNK_SIZE = 800  
@@ -34,6 +41,16 @@ def generate_id(text: str) -> str:
         return hashlib.md5(b"").hexdigest()
     return hashlib.md5(text.encode('utf-8')).hexdigest()
 
+def generate_point_id(payload: Dict[str, Any]) -> str:
+    """
+    Deterministic point ID: re-uploading the same file overwrites its chunks instead of duplicating them.
+    """
+    if 'source' in payload and 'chunk_index' in payload:
+        return generate_id(f"{payload['source']}_{payload['chunk_index']}")
+    if 'text' in payload:
+        return generate_id(payload['text'])
+    return str(uuid.uuid4())
+
 def clean_text(text: Optional[str]) -> str:
     """
     (Optional) Function to clean OCR garbage before chunking.
@@ -76,6 +93,95 @@ def format_search_results(search_results):
     return full_context
 
 
+# Query terms and snippet edges split on these; Thai writes words without spaces, so it is segmented separately
+TERM_SEPARATOR = re.compile(r"[\s.,;:!?\"'()\[\]{}]+")
+THAI_RUN = re.compile(r"[\u0e00-\u0e7f]+")
+# Thai following vowels and tone marks attach to the preceding consonant; leading vowels to the following one
+THAI_MARKS = set("\u0e30\u0e31\u0e32\u0e33\u0e34\u0e35\u0e36\u0e37\u0e38\u0e39\u0e3a\u0e47\u0e48\u0e49\u0e4a\u0e4b\u0e4c\u0e4d\u0e4e")
+THAI_LEADING_VOWELS = set("\u0e40\u0e41\u0e42\u0e43\u0e44")
+NGRAM_SIZE = 3
+
+def _thai_terms(run: str) -> List[str]:
+    """
+    Words of a Thai run via pythainlp, or overlapping character n-grams when it isn't installed.
+    """
+    if word_tokenize is not None:
+        return [w.strip() for w in word_tokenize(run, engine="newmm", keep_whitespace=False)]
+    if len(run) <= NGRAM_SIZE:
+        return [run]
+    return [run[i:i + NGRAM_SIZE] for i in range(len(run) - NGRAM_SIZE + 1)]
+
+def query_pattern(query: str) -> Optional[Pattern]:
+    """
+    Pattern matching any lowercased query term (longest first), for make_snippet. Compile once per request.
+    """
+    terms = set()
+    for token in TERM_SEPARATOR.split(query.lower()):
+        # "ลาพักร้อนได้กี่วัน" or "hr-ลาป่วย" would otherwise be one term that matches nothing
+        terms.update(THAI_RUN.sub(" ", token).split())
+        for run in THAI_RUN.findall(token):
+            terms.update(_thai_terms(run))
+    terms = sorted((t for t in terms if len(t) > 1), key=len, reverse=True)
+    if not terms:
+        return None
+    return re.compile("|".join(re.escape(t) for t in terms))
+
+def make_snippet(text: str, pattern: Optional[Pattern], length: int = 200, max_matches: int = 64) -> Tuple[str, List[List[int]]]:
+    """
+    Returns a window of about `length` characters around the densest cluster of query-term matches
+    (see query_pattern), plus [start, end) offsets of the matches inside the snippet for client-side highlighting.
+    """
+    matches = []
+    if pattern is not None:
+        # Matching the lowercased text is ~3x faster than re.IGNORECASE; offsets only line up when lengths do
+        haystack = text.lower()
+        if len(haystack) != len(text):
+            haystack, pattern = text, re.compile(pattern.pattern, re.IGNORECASE)
+        for m in itertools.islice(pattern.finditer(haystack), max_matches):
+            # Touching matches (Thai n-grams) highlight as one span
+            if matches and matches[-1][1] == m.start():
+                matches[-1] = (matches[-1][0], m.end())
+            else:
+                matches.append(m.span())
+
+    # Pick the window (anchored a little before a match) that covers the most matches
+    start = 0
+    if matches:
+        # Matches don't overlap, so starts and ends are both sorted: count each window with two bisects
+        starts = [s for s, _ in matches]
+        ends = [e for _, e in matches]
+        best = -1
+        for anchor in starts:
+            window_start = max(anchor - length // 4, 0)
+            covered = bisect.bisect_right(ends, window_start + length) - bisect.bisect_left(starts, window_start)
+            if covered > best:
+                best, start = covered, window_start
+    end = min(start + length, len(text))
+    start = max(min(start, end - length), 0)
+
+    # Snap to a separator when one is close; otherwise (e.g. Thai) at least don't split a character cluster
+    if start > 0:
+        separator = TERM_SEPARATOR.search(text, start, start + 20)
+        if separator is not None:
+            start = separator.end()
+        else:
+            while start > 0 and (text[start] in THAI_MARKS or text[start - 1] in THAI_LEADING_VOWELS):
+                start -= 1
+    if end < len(text):
+        separators = [m.start() for m in TERM_SEPARATOR.finditer(text, max(end - 20, start), end)]
+        if separators and separators[-1] > start:
+            end = separators[-1]
+        else:
+            while end < len(text) and (text[end] in THAI_MARKS or text[end - 1] in THAI_LEADING_VOWELS):
+                end += 1
+
+    prefix = "…" if start > 0 else ""
+    snippet = prefix + text[start:end] + ("…" if end < len(text) else "")
+    offset = len(prefix) - start
+    highlights = [[s + offset, e + offset] for s, e in matches if s >= start and e <= end]
+    return snippet, highlights
+
+
 def build_payload(
     text_chunk: str, 
     file_path: str, 
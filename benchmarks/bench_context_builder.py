@@ -0,0 +1,97 @@
+"""
+Benchmark: prompt tokens per answer and context build time,
+naive `format_search_results` vs token-budgeted `build_context`.
+
+Usage:
+    python -m benchmarks.bench_context_builder [--limit 10] [--budget 3000] [--live]
+
+--live also sends both prompts to the configured LLM and reports time to completion
+and the usage.prompt_tokens reported by the API (needs OPENAI_API_KEY).
+"""
+import argparse
+import random
+import time
+from types import SimpleNamespace
+
+from app.core.config import settings
+from app.utils.helpers import text_splitter, format_search_results
+from app.utils.context_builder import build_context, estimate_tokens
+
+WORDS = ("policy employee leave holiday salary approval manager request annual days "
+         "contract benefit overtime office remote training budget report quarter").split()
+
+
+def make_document(paragraphs: int, seed: int) -> str:
+    rng = random.Random(seed)
+    return "\n\n".join(
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(80, 400))) + "."
+        for _ in range(paragraphs)
+    )
+
+
+def make_hits(limit: int, seed: int = 7):
+    """
+    Simulates a top-k result: runs of neighbouring chunks from a few sources
+    plus a duplicated paragraph ingested under two file names.
+    """
+    rng = random.Random(seed)
+    hits = []
+    for doc in range(3):
+        chunks = text_splitter.split_text(make_document(30, seed + doc))
+        start = rng.randint(0, len(chunks) - limit)
+        for i in range(start, start + limit // 3 + 1):
+            hits.append(SimpleNamespace(score=rng.uniform(0.5, 0.9),
+                                        payload={"source": f"doc_{doc}.pdf", "chunk_index": i, "text": chunks[i]}))
+    duplicate = hits[0].payload
+    hits.append(SimpleNamespace(score=0.6, payload={**duplicate, "source": "copy_of_doc_0.pdf"}))
+    hits.sort(key=lambda h: h.score, reverse=True)
+    return hits[:limit]
+
+
+def timed(fn, repeat: int = 200):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        out = fn()
+    return out, (time.perf_counter() - start) / repeat * 1000
+
+
+def ask(client, query: str, context: str):
+    start = time.perf_counter()
+    response = client.chat.completions.create(
+        model=settings.LLM_MODEL,
+        messages=[{"role": "user", "content": f"Context:\n{context}\n\nQuestion: {query}"}],
+        max_tokens=256,
+        temperature=0.4
+    )
+    return time.perf_counter() - start, response.usage.prompt_tokens
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--budget", type=int, default=3000)
+    parser.add_argument("--live", action="store_true")
+    args = parser.parse_args()
+
+    hits = make_hits(args.limit)
+    naive, naive_ms = timed(lambda: format_search_results(hits))
+    # build_context does not modify the hits, so the same list is reused across repeats
+    packed, packed_ms = timed(lambda: build_context(hits, args.budget))
+
+    print(f"hits: {len(hits)}  budget: {args.budget} tokens")
+    print(f"{'mode':<10}{'chars':>10}{'est. tokens':>14}{'build ms':>12}")
+    print(f"{'naive':<10}{len(naive):>10}{estimate_tokens(naive):>14}{naive_ms:>12.3f}")
+    print(f"{'packed':<10}{len(packed):>10}{estimate_tokens(packed):>14}{packed_ms:>12.3f}")
+    print(f"token reduction: {1 - estimate_tokens(packed) / estimate_tokens(naive):.1%}")
+
+    if args.live:
+        from openai import OpenAI
+        client = OpenAI(api_key=settings.LLM_API_KEY, base_url=settings.LLM_BASE_URL)
+        query = "How many annual leave days does an employee get?"
+        for name, context in (("naive", naive), ("packed", packed)):
+            seconds, prompt_tokens = ask(client, query, context)
+            print(f"{name:<10} prompt_tokens={prompt_tokens:<8} time_to_completion={seconds:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark: memory (RSS) and query throughput of N API workers that each load the
+embedding model ("local") vs N workers sharing one embedding server ("remote").
+
+Usage:
+    python -m benchmarks.bench_embedding_server [--workers 4] [--queries 200] [--model BAAI/bge-m3]
+
+Each worker encodes `--queries` single-sentence queries (the search hot path).
+RSS is read from /proc, so this runs on Linux only.
+"""
+import argparse
+import multiprocessing as mp
+import os
+import subprocess
+import sys
+import time
+
+QUERIES = [
+    "What is the annual leave policy?",
+    "นโยบายการลาพักร้อนประจำปีคืออะไร",
+    "How do I submit an expense report?",
+    "Who approves overtime requests?",
+]
+
+
+def rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def worker(mode: str, model: str, socket_path: str, threads: int, queries: int, ready, start, results):
+    if mode == "local":
+        os.environ["OMP_NUM_THREADS"] = str(threads)
+        import torch
+        torch.set_num_threads(threads)
+        from sentence_transformers import SentenceTransformer
+        from app.ai_services.embeding_service import BGEEmbedding
+        embedder = BGEEmbedding(model=SentenceTransformer(model))
+    else:
+        from app.ai_services.embedding_client import RemoteBGEEmbedding
+        embedder = RemoteBGEEmbedding(socket_path=socket_path)
+
+    embedder.get_embeddings(QUERIES[0])  # warm-up
+    ready.release()
+    start.wait()
+    for i in range(queries):
+        embedder.get_embeddings([QUERIES[i % len(QUERIES)]])
+    results.put(rss_mb(os.getpid()))
+
+
+def run(mode: str, args) -> None:
+    ctx = mp.get_context("spawn")
+    server = None
+    if mode == "remote":
+        server = subprocess.Popen([sys.executable, "-m", "app.ai_services.embedding_server",
+                                   "--socket", args.socket, "--model", args.model, "--threads", str(args.cores)])
+        while not os.path.exists(args.socket):
+            time.sleep(0.2)
+
+    ready, start, results = ctx.Semaphore(0), ctx.Event(), ctx.Queue()
+    # Local workers split the cores between them, as uvicorn --workers N would have to
+    threads = max(args.cores // args.workers, 1)
+    procs = [ctx.Process(target=worker, args=(mode, args.model, args.socket, threads, args.queries, ready, start, results))
+             for _ in range(args.workers)]
+    for p in procs:
+        p.start()
+    for _ in procs:
+        ready.acquire()
+
+    t0 = time.perf_counter()
+    start.set()
+    worker_rss = [results.get() for _ in procs]
+    elapsed = time.perf_counter() - t0
+    for p in procs:
+        p.join()
+
+    server_rss = rss_mb(server.pid) if server else 0.0
+    if server:
+        server.terminate()
+        server.wait()
+
+    total = args.workers * args.queries
+    print(f"{mode:<8} workers={args.workers} total RSS={sum(worker_rss) + server_rss:>8.0f} MB "
+          f"(workers {sum(worker_rss):.0f} + server {server_rss:.0f})  "
+          f"throughput={total / elapsed:>7.1f} queries/s")
+
+
+def main():
+    from app.core.config import settings
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--model", default=settings.MODEL_NAME)
+    parser.add_argument("--cores", type=int, default=os.cpu_count())
+    parser.add_argument("--socket", default="/tmp/rag-embedding-bench.sock")
+    parser.add_argument("--mode", choices=["local", "remote", "both"], default="both")
+    args = parser.parse_args()
+
+    for mode in (["local", "remote"] if args.mode == "both" else [args.mode]):
+        run(mode, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: LLM gateway under a burst of questions against the local fake server.
+
+Usage:
+    python -m benchmarks.bench_llm_gateway [--requests 200] [--distinct 10] [--concurrency 8]
+
+Starts benchmarks.fake_llm_server in-process, fires the burst (many identical questions),
+and reports upstream calls, coalesced calls, failures and latency percentiles.
+"""
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+
+import httpx
+import uvicorn
+
+from app.ai_services.llm_gateway import LLMGateway, LLMGatewayError
+from benchmarks.fake_llm_server import create_app
+
+
+def start_fake_server(port: int, latency: float, rate_limit: float, error_rate: float) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(create_app(latency, rate_limit, error_rate),
+                                           host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def run_burst(args) -> None:
+    gateway = LLMGateway(
+        api_key="fake",
+        base_url=f"http://127.0.0.1:{args.port}/v1",
+        model="fake",
+        max_concurrency=args.concurrency,
+        timeout=5,
+        deadline=30,
+        backoff_base=0.05,
+        backoff_max=0.5,
+    )
+    latencies, failures = [], 0
+
+    async def one(i: int):
+        nonlocal failures
+        start = time.perf_counter()
+        try:
+            await gateway.complete([{"role": "user", "content": f"question {i % args.distinct}"}])
+        except LLMGatewayError:
+            failures += 1
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.requests)))
+    elapsed = time.perf_counter() - start
+    await gateway.aclose()
+
+    stats = httpx.get(f"http://127.0.0.1:{args.port}/stats").json()
+    latencies.sort()
+    print(f"requests={args.requests} distinct={args.distinct} concurrency={args.concurrency}")
+    print(f"upstream calls={gateway.upstream_calls} coalesced={gateway.coalesced_calls} "
+          f"server saw={stats['requests']} (429s={stats['rate_limited']}, 5xx={stats['errors']})")
+    print(f"failures={failures} wall={elapsed:.2f}s "
+          f"p50={statistics.median(latencies) * 1000:.0f}ms p95={latencies[int(len(latencies) * 0.95) - 1] * 1000:.0f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--distinct", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--rate-limit", type=float, default=0.1)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    args = parser.parse_args()
+
+    server = start_fake_server(args.port, args.latency, args.rate_limit, args.error_rate)
+    try:
+        asyncio.run(run_burst(args))
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark: response size and serialization time of /search responses.
+
+Usage:
+    python -m benchmarks.bench_search_response [--limit 10] [--repeat 500]
+
+"baseline" is the previous path: FastAPI's jsonable_encoder over raw ScoredPoint objects.
+The other rows build SearchResponse with SearchService's projection / snippet logic
+and serialize it with pydantic-core, as the routes now do.
+"""
+import argparse
+import json
+import random
+import time
+
+from fastapi.encoders import jsonable_encoder
+from qdrant_client import models
+
+from app.api.schemas.models import SearchHit, SearchResponse
+from app.services.search_service import SearchService
+from app.utils.helpers import build_payload, make_snippet, query_pattern, generate_point_id
+
+QUERY = "annual leave policy"
+WORDS = ("policy employee leave holiday salary approval manager request annual days contract benefit "
+         "office remote training budget report quarter overtime travel expense insurance review").split()
+
+
+def make_points(limit: int):
+    rng = random.Random(0)
+    points = []
+    for i in range(limit):
+        text = " ".join(rng.choice(WORDS) for _ in range(130))[:800]
+        payload = build_payload(text, f"handbook_{i % 3}.pdf", i, "PDF")
+        points.append(models.ScoredPoint(id=generate_point_id(payload), version=3, score=rng.random(), payload=payload))
+    return points
+
+
+def lean(points, include_fields=None, exclude_fields=None, snippet=False) -> bytes:
+    pattern = query_pattern(QUERY) if snippet else None
+    hits = []
+    for point in points:
+        snippet_text, highlights = make_snippet(point.payload["text"], pattern, 200) if snippet else (None, None)
+        hits.append(SearchHit.model_construct(
+            id=point.id,
+            score=point.score,
+            payload=SearchService._project(point.payload, include_fields, exclude_fields, snippet),
+            snippet=snippet_text,
+            highlights=highlights
+        ))
+    return SearchResponse.model_construct(results=hits, answer=None).model_dump_json(exclude_none=True).encode("utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    points = make_points(args.limit)
+    modes = {
+        "baseline": lambda: json.dumps(jsonable_encoder({"results": points, "answer": None}), ensure_ascii=False).encode("utf-8"),
+        "full payload": lambda: lean(points),
+        "exclude text": lambda: lean(points, exclude_fields=["text"]),
+        "snippet": lambda: lean(points, snippet=True),
+        "source + snippet": lambda: lean(points, include_fields=["source"], snippet=True),
+    }
+
+    print(f"hits per response: {args.limit}")
+    print(f"{'mode':<18}{'bytes':>10}{'us/response':>14}")
+    for name, serialize in modes.items():
+        body = serialize()
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            serialize()
+        elapsed_us = (time.perf_counter() - start) / args.repeat * 1e6
+        print(f"{name:<18}{len(body):>10}{elapsed_us:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark: search latency and recall@k of the vector-store backends.
+
+Usage:
+    python -m benchmarks.bench_vector_store [--points 20000] [--dim 1024] [--queries 200] [--qdrant-url http://localhost:6333]
+
+Backends: LocalVectorStore exact, LocalVectorStore HNSW (if hnswlib is installed),
+Qdrant local mode, and a Qdrant server when --qdrant-url is given.
+Recall is measured against brute-force ground truth on the same normalized vectors.
+"""
+import argparse
+import shutil
+import statistics
+import tempfile
+import time
+
+import numpy as np
+from qdrant_client import QdrantClient
+
+from app.db.local_vector_store import LocalVectorStore, hnswlib
+from app.db.qdrant_service import QdrantService
+from app.utils.helpers import build_payload, generate_point_id
+
+COLLECTION = "bench"
+
+
+def make_data(points: int, dim: int, queries: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    # Clustered data: closer to real embeddings than uniform noise
+    centers = rng.normal(size=(64, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, 64, points)] + 0.5 * rng.normal(size=(points, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    query_vectors = vectors[rng.integers(0, points, queries)] + 0.1 * rng.normal(size=(queries, dim)).astype(np.float32)
+    payloads = [build_payload(f"chunk {i}", f"doc_{i % 100}.pdf", i, "PDF") for i in range(points)]
+    return vectors, query_vectors, payloads
+
+
+def ground_truth(vectors: np.ndarray, queries: np.ndarray, k: int):
+    scores = queries @ vectors.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def run_backend(name: str, store, vectors, queries, payloads, truth, k: int):
+    store.create_collection(COLLECTION, vector_size=vectors.shape[1])
+    start = time.perf_counter()
+    for i in range(0, len(vectors), 1000):
+        store.upsert_data(COLLECTION, vectors[i:i + 1000].tolist(), payloads[i:i + 1000])
+    load_seconds = time.perf_counter() - start
+
+    row_of_id = {generate_point_id(payload): row for row, payload in enumerate(payloads)}
+    store.search_similarity(COLLECTION, queries[0].tolist(), k)  # warm-up (builds HNSW lazily)
+
+    latencies, recalls = [], []
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        hits = store.search_similarity(COLLECTION, query.tolist(), k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        found = {row_of_id[str(hit.id).replace("-", "")] for hit in hits}
+        recalls.append(len(found & set(expected.tolist())) / k)
+
+    latencies.sort()
+    print(f"{name:<22}{load_seconds:>9.2f}s{statistics.median(latencies):>10.2f}"
+          f"{latencies[int(len(latencies) * 0.95) - 1]:>10.2f}{statistics.mean(recalls):>12.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--qdrant-url")
+    args = parser.parse_args()
+
+    vectors, queries, payloads = make_data(args.points, args.dim, args.queries)
+    truth = ground_truth(vectors, queries, args.k)
+    print(f"points={args.points} dim={args.dim} queries={args.queries} k={args.k}")
+    print(f"{'backend':<22}{'load':>10}{'p50 ms':>10}{'p95 ms':>10}{'recall@k':>12}")
+
+    backends = [("local exact", lambda path: LocalVectorStore(path, hnsw_threshold=args.points + 1))]
+    if hnswlib is not None:
+        backends.append(("local hnsw", lambda path: LocalVectorStore(path, hnsw_threshold=0)))
+    backends.append(("qdrant local mode", lambda path: QdrantService(QdrantClient(path=path))))
+    if args.qdrant_url:
+        backends.append(("qdrant server", lambda path: QdrantService(QdrantClient(url=args.qdrant_url))))
+
+    for name, factory in backends:
+        path = tempfile.mkdtemp(prefix="bench_vs_")
+        store = factory(path)
+        try:
+            run_backend(name, store, vectors, queries, payloads, truth, args.k)
+        finally:
+            if isinstance(store, QdrantService):
+                store.client.delete_collection(COLLECTION)
+            shutil.rmtree(path, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Local fake OpenAI-compatible chat-completions server for exercising the LLM gateway.
+
+Usage:
+    python -m benchmarks.fake_llm_server --port 8099 --latency 0.5 --rate-limit 0.1 --error-rate 0.05
+    LLM_BASE_URL=http://127.0.0.1:8099/v1 uvicorn app.main:app
+
+GET /stats returns the number of upstream requests received, and POST /fail toggles a full outage.
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+def create_app(latency: float = 0.2, rate_limit: float = 0.0, error_rate: float = 0.0) -> FastAPI:
+    app = FastAPI(title="Fake LLM")
+    state = {"requests": 0, "rate_limited": 0, "errors": 0, "outage": False}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        state["requests"] += 1
+        await asyncio.sleep(latency)
+
+        roll = random.random()
+        if state["outage"] or roll < error_rate:
+            state["errors"] += 1
+            return JSONResponse(status_code=500, content={"error": {"message": "fake upstream error"}})
+        if roll < error_rate + rate_limit:
+            state["rate_limited"] += 1
+            return JSONResponse(status_code=429, content={"error": {"message": "fake rate limit"}},
+                                headers={"retry-after": "0.1"})
+
+        question = body["messages"][-1]["content"]
+        return {
+            "id": f"fake-{state['requests']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": f"Fake answer ({len(question)} chars of prompt)"}
+            }],
+            "usage": {"prompt_tokens": len(question) // 3, "completion_tokens": 5, "total_tokens": len(question) // 3 + 5}
+        }
+
+    @app.get("/stats")
+    async def stats():
+        return state
+
+    @app.post("/fail")
+    async def toggle_outage():
+        state["outage"] = not state["outage"]
+        return state
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--rate-limit", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.latency, args.rate_limit, args.error_rate), host="127.0.0.1", port=args.port, log_level="warning")